@@ -0,0 +1,113 @@
+from collections import defaultdict
+from contextlib import contextmanager
+import time
+
+# One round-trip snapshot of the signals we wait on. The first call installs a
+# MutationObserver that timestamps every DOM change, so quiet_ms is the time
+# since the page last changed.
+PAGE_STATE_JS = """
+if (!window.__scraperObserver) {
+    window.__scraperLastMutation = Date.now();
+    window.__scraperObserver = new MutationObserver(function () {
+        window.__scraperLastMutation = Date.now();
+    });
+    window.__scraperObserver.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+}
+return {
+    replies: document.querySelectorAll('[data-testid="tweetText"]').length,
+    height: document.documentElement.scrollHeight,
+    spinners: document.querySelectorAll('[role="progressbar"]').length,
+    quiet_ms: Date.now() - window.__scraperLastMutation
+};
+"""
+
+class PageTimings:
+    """Per-URL breakdown of where scraping time goes"""
+
+    def __init__(self, url):
+        self.url = url
+        self.start = time.monotonic()
+        self.seconds = defaultdict(float)
+        self.counts = defaultdict(int)
+        # Non-time measurements such as bytes transferred
+        self.stats = {}
+        # (name, fields) of individual steps such as scroll attempts, written out by ScraperMetrics
+        self.events = []
+
+    def add(self, phase, seconds):
+        self.seconds[phase] += seconds
+        self.counts[phase] += 1
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block of work under `name`"""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(name, time.monotonic() - start)
+
+    def count(self, name, n=1):
+        self.stats[name] = self.stats.get(name, 0) + n
+
+    def event(self, name, **fields):
+        self.events.append((name, fields))
+
+    def report(self):
+        """Print the time spent per phase for this URL, slowest first"""
+        total = time.monotonic() - self.start
+        print(f"Timing breakdown for {self.url} ({total:.1f}s total):")
+        for phase, seconds in sorted(self.seconds.items(), key=lambda item: -item[1]):
+            print(f"  {phase:<28} {seconds:7.1f}s  ({self.counts[phase]}x)")
+        print(f"  {'other':<28} {max(total - sum(self.seconds.values()), 0):7.1f}s")
+        for name, value in self.stats.items():
+            print(f"  {name:<28} {value}")
+
+def timed_wait(condition, timeout, label, timings=None, poll=0.25):
+    """Poll `condition` until it is truthy or `timeout` passes; returns (result, seconds waited)"""
+    start = time.monotonic()
+    result = None
+    while True:
+        try:
+            result = condition()
+        except Exception:
+            result = None
+        if result or time.monotonic() - start >= timeout:
+            break
+        time.sleep(poll)
+    elapsed = time.monotonic() - start
+    if timings is not None:
+        timings.add(f"wait:{label}", elapsed)
+    if not result:
+        print(f"Wait '{label}' hit its {timeout}s ceiling")
+    return result, elapsed
+
+def get_page_state(driver):
+    """Reply count, scroll height, spinner count and DOM quiet time in one call"""
+    return driver.execute_script(PAGE_STATE_JS)
+
+def wait_for_quiescence(driver, timeout, label, timings=None, quiet_ms=750):
+    """Wait until no spinner is shown and the DOM has not changed for `quiet_ms`"""
+    def settled():
+        state = get_page_state(driver)
+        return state['spinners'] == 0 and state['quiet_ms'] >= quiet_ms
+    return timed_wait(settled, timeout, label, timings)
+
+def wait_for_new_content(driver, before, timeout, label, timings=None, quiet_ms=500, idle_ms=2000):
+    """After a scroll or click: wait for more replies or a taller page, then for the DOM to settle.
+
+    Returns early if the page sits idle for `idle_ms` with no change, which is
+    what the end of a thread looks like. Idle time only counts from the start of
+    this wait: a page that was already quiet before the scroll has not yet had
+    a chance to respond to it.
+    """
+    start = time.monotonic()
+
+    def loaded():
+        state = get_page_state(driver)
+        if state['spinners']:
+            return False
+        changed = state['replies'] != before['replies'] or state['height'] > before['height']
+        idle = min(state['quiet_ms'], (time.monotonic() - start) * 1000)
+        return (changed and state['quiet_ms'] >= quiet_ms) or idle >= idle_ms
+    return timed_wait(loaded, timeout, label, timings)
@@ -0,0 +1,76 @@
+import argparse
+import random
+import time
+import unicodedata
+import regex
+
+from comment_cleaning import clean_comment_texts
+
+# Seed replies in the corpus's main scripts; variants below mimic what the scraper sees
+SEED_TEXTS = [
+    'Learning Hindi as a third language is not Imposition.',
+    'Bending on knees!! @HRDMinistry',
+    'इसलिए कहते हैं मेरा पंढरपुर से पुराना नाता है',
+    'पीएम मोदी ने कहा कि आरएसएस के माध्यम से ही उनका जुड़ाव हुआ',
+    'தமிழ் வாழ்க! மொழி திணிப்பு வேண்டாம்',
+    'இந்தி திணிப்பை எதிர்ப்போம் #StopHindiImposition',
+    'Good decision by the Centre 👍',
+    'café résumé naïve',
+]
+NOISE_TEXTS = ['👍👍👍', '...', '🙏', '!!!', '']
+
+def make_variant(text, rng):
+    """Return a near-duplicate the old exact-match dedupe would miss"""
+    choice = rng.randrange(4)
+    if choice == 0:
+        position = rng.randrange(len(text) + 1)
+        return text[:position] + '\u200b' + text[position:]
+    if choice == 1:
+        return text.replace(' ', '  \n', 1)
+    if choice == 2:
+        return unicodedata.normalize('NFD', text)
+    return text
+
+def synthetic_corpus(rows, seed=7):
+    """Multilingual comment column with exact duplicates, near-duplicates and emoji-only noise"""
+    rng = random.Random(seed)
+    texts = []
+    for i in range(rows):
+        roll = rng.random()
+        if roll < 0.1:
+            texts.append(rng.choice(NOISE_TEXTS))
+        elif roll < 0.4:
+            texts.append(make_variant(rng.choice(SEED_TEXTS), rng))
+        else:
+            texts.append(f'{rng.choice(SEED_TEXTS)} {i}')
+    return texts
+
+def legacy_clean(texts):
+    """The previous per-comment path: exact strip() dedupe, then an uncompiled regex.search per comment"""
+    seen = set()
+    keep = []
+    for index, text in enumerate(texts):
+        key = text.strip()
+        if key in seen:
+            continue
+        seen.add(key)
+        if regex.search(r'\p{L}|\p{N}', text):
+            keep.append(index)
+    return keep
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput of the batch comment cleaning stage')
+    parser.add_argument('--rows', type=int, default=2_000_000, help='Synthetic comments to generate')
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows:,} synthetic comments...")
+    texts = synthetic_corpus(args.rows)
+
+    for name, clean in (('legacy per-comment', legacy_clean), ('batch clean_comment_texts', clean_comment_texts)):
+        start = time.perf_counter()
+        kept = clean(texts)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>26}: {args.rows / elapsed:12,.0f} comments/sec, kept {len(kept):,} in {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from corpus_db import SOURCES, connect, ingest, list_source_files, normalize_document, search
+
+# (text, channels, since, until) queries of the kind analysis asks for
+QUERIES = [
+    ('hindi', None, None, None),
+    ('tamil', ['ndtv', 'the_hindu'], '2019-01-01', None),
+    ('मोदी', None, '2025-01-01', '2025-12-31'),
+    ('தமிழ்', None, None, None),
+    ('imposition', ['timesofindia', 'IndiaToday', 'PTI_News'], None, None),
+]
+
+def scan_search(text, channels=None, since=None, until=None):
+    """The current approach: load every file of every layout and filter comments in Python"""
+    words = text.lower().split()
+    hits = 0
+    for source in SOURCES:
+        for path in list_source_files(source, source):
+            with open(path, 'r', encoding='utf-8') as f:
+                document = json.load(f)
+            for conversation, _, comments in normalize_document(source, document):
+                if channels and conversation['channel'] not in channels:
+                    continue
+                for comment in comments:
+                    comment_time = comment['comment_time']
+                    if since and not (comment_time and comment_time >= since):
+                        continue
+                    if until and not (comment_time and comment_time < until):
+                        continue
+                    body = (comment['text'] or '').lower()
+                    if all(word in body for word in words):
+                        hits += 1
+    return hits
+
+def timed(function, repeat):
+    """Median seconds over `repeat` runs, plus the last result"""
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        seconds.append(time.perf_counter() - start)
+    return statistics.median(seconds), result
+
+def main():
+    parser = argparse.ArgumentParser(description='Query latency: SQLite corpus store vs scanning every JSON file')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    db_file = os.path.join(tempfile.mkdtemp(prefix='corpus_bench_'), 'corpus.db')
+    conn = connect(db_file)
+    ingest_seconds, (ingested, _) = timed(lambda: ingest(conn), 1)
+    resync_seconds, _ = timed(lambda: ingest(conn), 1)
+    print(f"Initial ingest: {ingested} files in {ingest_seconds:.2f}s; "
+          f"no-op re-ingest {resync_seconds * 1000:.1f} ms; database {os.path.getsize(db_file) / 1e6:.1f} MB")
+
+    print(f"\n{'query':<16} {'scan hits':>9} {'scan ms':>9} {'db hits':>8} {'db ms':>8} {'speedup':>8}")
+    for text, channels, since, until in QUERIES:
+        scan_seconds, scan_hits = timed(lambda: scan_search(text, channels, since, until), args.repeat)
+        db_seconds, rows = timed(lambda: search(conn, text, channels, since, until, limit=1000000), args.repeat)
+        print(f"{text:<16} {scan_hits:>9} {scan_seconds * 1000:>9.1f} {len(rows):>8} {db_seconds * 1000:>8.2f} "
+              f"{scan_seconds / max(db_seconds, 1e-9):>7.0f}x")
+    conn.close()
+    print("\nScan hits count substring matches; db hits count whole-word full-text matches.")
+
+if __name__ == "__main__":
+    main()
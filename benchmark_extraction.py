@@ -0,0 +1,49 @@
+from selenium import webdriver
+import argparse
+import os
+import time
+
+from scraper_metrics import count_driver_calls
+from twitter_scraper_new import extract_comments_batched, extract_comments_per_element
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'reply_thread.html')
+
+def run_benchmark(driver, extract, counter, repeats):
+    """Run one extraction path several times and return (comments, driver calls, seconds) per run"""
+    counter['calls'] = 0
+    start = time.perf_counter()
+    for _ in range(repeats):
+        comments = extract(driver)
+    elapsed = time.perf_counter() - start
+    return comments, counter['calls'] / repeats, elapsed / repeats
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare batched and per-element reply extraction')
+    parser.add_argument('--fixture', default=FIXTURE_PATH, help='Saved reply-thread HTML file')
+    parser.add_argument('--repeats', type=int, default=5, help='Extraction runs per path')
+    args = parser.parse_args()
+
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    driver = webdriver.Chrome(options=options)
+
+    try:
+        driver.get('file://' + os.path.abspath(args.fixture))
+        counter = count_driver_calls(driver)
+
+        results = {}
+        for name, extract in (('per-element', extract_comments_per_element), ('batched', extract_comments_batched)):
+            comments, calls, seconds = run_benchmark(driver, extract, counter, args.repeats)
+            results[name] = comments
+            print(f"{name:>12}: {len(comments)} replies, {calls:.0f} driver calls, {seconds * 1000:.1f} ms per pass")
+
+        strip = lambda comments: [{k: v for k, v in c.items() if k != 'scrape_time'} for c in comments]
+        if strip(results['per-element']) == strip(results['batched']):
+            print("Both paths extracted identical replies")
+        else:
+            print("Warning: batched and per-element extraction results differ")
+    finally:
+        driver.quit()
+
+if __name__ == "__main__":
+    main()
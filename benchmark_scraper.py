@@ -0,0 +1,176 @@
+from selenium import webdriver
+import argparse
+import glob
+import json
+import os
+import resource
+import tempfile
+import time
+
+import checkpoint_journal
+import twitter_scraper_new
+from adaptive_waits import PageTimings
+from browser_profile import apply_lean_options, block_heavy_requests, get_page_traffic, start_traffic_recording
+from mock_twitter_server import MockTwitterConfig, start_mock_server
+from network_capture import enable_performance_logging
+from scraper_metrics import count_driver_calls, process_tree_memory_kb
+
+class RunMetrics:
+    """Driver calls, checkpoint bytes and browser memory collected during one benchmark run"""
+
+    def __init__(self):
+        self.counters = []
+        self.bytes_transferred = 0
+        self.page_load_ms = []
+        self.extract_seconds = []
+        self.checkpoint_bytes = 0
+        self.browser_peak_rss_kb = 0
+
+    def driver_calls(self):
+        return sum(counter['calls'] for counter in self.counters)
+
+def instrument_checkpoints(metrics):
+    """Count bytes written by full checkpoints and journal appends"""
+    save = twitter_scraper_new.save_comments_checkpoint
+    append = checkpoint_journal.CheckpointJournal.append
+
+    def counting_save(filename, *args, **kwargs):
+        save(filename, *args, **kwargs)
+        metrics.checkpoint_bytes += os.path.getsize(filename)
+
+    def counting_append(self, *args, **kwargs):
+        before = self.bytes_written
+        append(self, *args, **kwargs)
+        metrics.checkpoint_bytes += self.bytes_written - before
+
+    twitter_scraper_new.save_comments_checkpoint = counting_save
+    checkpoint_journal.CheckpointJournal.append = counting_append
+
+def make_driver_factory(metrics, capture_mode, headless=True, profile='full'):
+    def create_driver(capture_mode_override=None, profile_override=None):
+        options = webdriver.ChromeOptions()
+        lean = (profile_override or profile) == 'lean'
+        if lean:
+            apply_lean_options(options, headless=headless)
+        else:
+            if headless:
+                options.add_argument('--headless=new')
+            options.add_argument('--window-size=1280,900')
+        if (capture_mode_override or capture_mode) == 'network':
+            enable_performance_logging(options)
+        driver = webdriver.Chrome(options=options)
+        if lean:
+            block_heavy_requests(driver)
+        metrics.counters.append(count_driver_calls(driver))
+        original_quit = driver.quit
+
+        def quit_and_record():
+            pid = driver.service.process.pid
+            metrics.browser_peak_rss_kb = max(metrics.browser_peak_rss_kb, process_tree_memory_kb(pid))
+            original_quit()
+
+        driver.quit = quit_and_record
+        return driver
+    return create_driver
+
+def conversation_urls(base_url, count):
+    return [f'{base_url}/mock_channel/status/{1900000000000000000 + i * 1000000}' for i in range(count)]
+
+def benchmark_scroll(base_url, args, metrics):
+    """Run scroll_and_extract_comments directly on each mock conversation"""
+    driver = make_driver_factory(metrics, args.capture_mode, not args.headful, args.profile)()
+    replies, per_url = 0, []
+    try:
+        twitter_scraper_new.login_to_twitter(driver, 'mock', 'mock', base_url=base_url)
+        for url in conversation_urls(base_url, args.urls):
+            channel_name, conversation_id = twitter_scraper_new.extract_url_info(url)
+            timings = PageTimings(url)
+            start = time.perf_counter()
+            driver.get(url)
+            start_traffic_recording(driver)
+            result = twitter_scraper_new.scroll_and_extract_comments(
+                driver, conversation_id, url, twitter_scraper_new.get_output_filename(url),
+                timings=timings, capture_mode=args.capture_mode, checkpoint_mode=args.checkpoint_mode,
+                dom_mode=args.dom_mode)
+            traffic = get_page_traffic(driver)
+            metrics.bytes_transferred += traffic['bytes_transferred']
+            metrics.page_load_ms.append(traffic['page_load_ms'] or 0)
+            metrics.extract_seconds.append(timings.seconds['extract'] / max(timings.counts['extract'], 1))
+            per_url.append(time.perf_counter() - start)
+            replies += len(result['comments'])
+    finally:
+        driver.quit()
+    return replies, per_url
+
+def benchmark_main(base_url, args, metrics):
+    """Run main() end to end over a DataPaper.csv pointing at the mock site"""
+    with open('DataPaper.csv', 'w') as f:
+        for url in conversation_urls('https://x.com', args.urls):
+            f.write(url + '\n')
+    twitter_scraper_new.create_driver = make_driver_factory(metrics, args.capture_mode, not args.headful, args.profile)
+    twitter_scraper_new.CAPTURE_MODE = args.capture_mode
+    twitter_scraper_new.DOM_MODE = args.dom_mode
+    start = time.perf_counter()
+    twitter_scraper_new.main(num_workers=args.workers, base_url=base_url, url_delay=0, max_retry_wait=0)
+    elapsed = time.perf_counter() - start
+    replies = 0
+    for path in glob.glob('new_data/*.json'):
+        with open(path, encoding='utf-8') as f:
+            replies += len(json.load(f)['comments']['comments'])
+    return replies, [elapsed / max(args.urls, 1)] * args.urls
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline scraper throughput benchmark against a mock X site')
+    parser.add_argument('--target', choices=['scroll', 'main'], default='scroll')
+    parser.add_argument('--urls', type=int, default=3)
+    parser.add_argument('--thread-size', type=int, default=200)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--show-more-every', type=int, default=3)
+    parser.add_argument('--spam-replies', type=int, default=10)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--capture-mode', choices=['dom', 'network'], default='dom')
+    parser.add_argument('--dom-mode', choices=['full', 'mark', 'prune'], default='full')
+    parser.add_argument('--checkpoint-mode', choices=['journal', 'full'], default='journal')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--profile', choices=['full', 'lean'], default='full')
+    parser.add_argument('--headful', action='store_true')
+    args = parser.parse_args()
+
+    config = MockTwitterConfig(args.thread_size, args.page_size, args.latency, args.show_more_every,
+                               args.spam_replies, args.failure_rate, args.seed)
+    server, base_url = start_mock_server(config)
+    metrics = RunMetrics()
+    instrument_checkpoints(metrics)
+
+    workdir = tempfile.mkdtemp(prefix='scraper_bench_')
+    os.chdir(workdir)
+    os.makedirs('new_data')
+    try:
+        if args.target == 'scroll':
+            replies, per_url = benchmark_scroll(base_url, args, metrics)
+        else:
+            replies, per_url = benchmark_main(base_url, args, metrics)
+    finally:
+        server.shutdown()
+
+    total = sum(per_url)
+    print(f"\nBenchmark ({args.target}, {args.capture_mode} capture, {args.checkpoint_mode} checkpoints, "
+          f"{args.dom_mode} DOM, {args.profile} profile) in {workdir}")
+    print(f"  URLs:               {len(per_url)}")
+    print(f"  replies:            {replies}")
+    print(f"  replies/sec:        {replies / total if total else 0:.1f}")
+    print(f"  seconds per URL:    {total / max(len(per_url), 1):.2f}")
+    print(f"  driver calls:       {metrics.driver_calls()}")
+    print(f"  checkpoint bytes:   {metrics.checkpoint_bytes}")
+    if metrics.extract_seconds:
+        print(f"  extract per pass:   {1000 * sum(metrics.extract_seconds) / len(metrics.extract_seconds):.1f} ms")
+    if metrics.page_load_ms:
+        print(f"  bytes transferred:  {metrics.bytes_transferred}")
+        print(f"  page load (avg):    {sum(metrics.page_load_ms) / len(metrics.page_load_ms):.0f} ms")
+    print(f"  peak RSS (python):  {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+    print(f"  peak RSS (browser): {metrics.browser_peak_rss_kb / 1024:.1f} MiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# Lean Chrome profile for scraping: headless, small fixed viewport, and no
+# images/media/fonts/analytics, none of which the scraper ever extracts.
+
+LEAN_WINDOW_SIZE = '1280,900'
+
+# Chrome flags that cut renderer/background memory; used with the lean profile
+MEMORY_SAVER_ARGUMENTS = [
+    '--disable-extensions',
+    '--disable-gpu',
+    '--disable-dev-shm-usage',
+    '--disable-background-networking',
+    '--disable-background-timer-throttling',
+    '--disable-renderer-backgrounding',
+    '--disable-features=Translate,MediaRouter,OptimizationHints',
+    '--renderer-process-limit=2',
+    '--mute-audio',
+    '--autoplay-policy=user-gesture-required',
+]
+
+# URL patterns handed to Network.setBlockedURLs
+BLOCKED_URL_PATTERNS = [
+    # Images and avatars
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*pbs.twimg.com/media/*', '*pbs.twimg.com/profile_images/*', '*pbs.twimg.com/profile_banners/*',
+    '*pbs.twimg.com/card_img/*', '*pbs.twimg.com/ext_tw_video_thumb/*', '*pbs.twimg.com/amplify_video_thumb/*',
+    # Video and audio
+    '*video.twimg.com/*', '*.mp4', '*.m3u8', '*.m4s', '*.webm', '*.mp3',
+    # Fonts
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    # Analytics and client event logging
+    '*google-analytics.com/*', '*googletagmanager.com/*', '*analytics.twitter.com/*',
+    '*/1.1/jot/*', '*/i/api/1.1/jot/*', '*ads-api.twitter.com/*', '*ads-twitter.com/*',
+]
+
+# Bytes transferred and load time for the current page, from the Resource Timing API
+PAGE_TRAFFIC_JS = """
+var navigation = performance.getEntriesByType('navigation')[0];
+var bytes = navigation ? navigation.transferSize : 0;
+var resources = performance.getEntriesByType('resource');
+for (var i = 0; i < resources.length; i++) {
+    bytes += resources[i].transferSize || 0;
+}
+return {
+    bytes_transferred: bytes,
+    resource_count: resources.length,
+    page_load_ms: navigation ? Math.round(navigation.loadEventEnd - navigation.startTime) : null
+};
+"""
+
+def apply_lean_options(options, memory_saver=True, headless=True):
+    """Configure ChromeOptions for the lean profile"""
+    if headless:
+        options.add_argument('--headless=new')
+    options.add_argument(f'--window-size={LEAN_WINDOW_SIZE}')
+    options.add_argument('--blink-settings=imagesEnabled=false')
+    options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.images': 2,
+        'profile.default_content_setting_values.notifications': 2,
+    })
+    if memory_saver:
+        for argument in MEMORY_SAVER_ARGUMENTS:
+            options.add_argument(argument)
+    return options
+
+def block_heavy_requests(driver, patterns=BLOCKED_URL_PATTERNS):
+    """Block images/media/fonts/analytics for this session through CDP"""
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
+def start_traffic_recording(driver):
+    """Keep every resource timing entry for the page (the default buffer holds 250)"""
+    driver.execute_script("performance.setResourceTimingBufferSize(100000);")
+
+def get_page_traffic(driver):
+    """Bytes transferred, resource count and load time for the current page"""
+    return driver.execute_script(PAGE_TRAFFIC_JS)
@@ -0,0 +1,81 @@
+import json
+import os
+import time
+
+def get_journal_filename(output_filename):
+    """Journal path next to the output file: new_data/<channel>_comments_<id>.jsonl"""
+    base, _ = os.path.splitext(output_filename)
+    return base + '.jsonl'
+
+class CheckpointJournal:
+    """Append-only JSONL journal of newly seen replies for one conversation"""
+
+    def __init__(self, filename, fsync_every=5):
+        self.filename = filename
+        self.fsync_every = fsync_every
+        self.appends_since_sync = 0
+        self.bytes_written = 0
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(filename, 'a', encoding='utf-8')
+        # Terminate a line torn by a crash so new entries start on a fresh line
+        if self.file.tell() > 0:
+            with open(filename, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self.file.write('\n')
+
+    def append(self, comments, last_height):
+        """Append new comments plus a checkpoint marker; fsync every `fsync_every` appends"""
+        lines = [json.dumps({'type': 'comment', 'comment': c}, ensure_ascii=False) for c in comments]
+        lines.append(json.dumps({
+            'type': 'checkpoint',
+            'last_scroll_position': last_height,
+            'last_save_time': time.strftime('%Y-%m-%d %H:%M:%S')
+        }))
+        data = '\n'.join(lines) + '\n'
+        self.file.write(data)
+        self.file.flush()
+        self.bytes_written += len(data.encode('utf-8'))
+        self.appends_since_sync += 1
+        if self.fsync_every and self.appends_since_sync >= self.fsync_every:
+            self.sync()
+
+    def sync(self):
+        """Force journal contents to disk"""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.appends_since_sync = 0
+
+    def close(self):
+        if not self.file.closed:
+            self.sync()
+            self.file.close()
+
+def replay_journal(filename):
+    """Replay a journal into (comments, last_scroll_position); a torn final line is ignored"""
+    comments = []
+    last_height = 0
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Skipping unreadable journal line in {filename}")
+                    continue
+                if entry.get('type') == 'comment':
+                    comments.append(entry['comment'])
+                elif entry.get('type') == 'checkpoint':
+                    last_height = entry.get('last_scroll_position', last_height)
+    except FileNotFoundError:
+        pass
+    return comments, last_height
+
+def remove_journal(filename):
+    """Delete a journal once its contents are compacted into the JSON output"""
+    try:
+        os.remove(filename)
+    except FileNotFoundError:
+        pass
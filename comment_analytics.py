@@ -0,0 +1,337 @@
+import argparse
+import hashlib
+import heapq
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import regex
+
+from comment_cleaning import normalize_text
+from processed_files import COMBINED_BASENAME
+
+ANALYTICS_FILE = 'comment_analytics.json'
+
+KINDS = ('hashtags', 'mentions', 'unigrams', 'bigrams')
+
+# Wildcard channel/bucket under which the overall counts are kept
+ALL = '*'
+
+# Links with a scheme or www., email addresses, and the bare domain.tld/path form X
+# shows in reply text (x.com/ndtv/status/..., youtu.be/...). A domain with no path
+# only counts for common TLDs, so 'ok.thanks' style typos are kept.
+URL_PATTERN = regex.compile(
+    r'https?://\S+|www\.\S+|[\w.+-]+@(?:[a-z0-9-]+\.)+[a-z]{2,}\b'
+    r'|(?<![\w@.])(?:[a-z0-9-]+\.)+(?:[a-z]{2,}/\S*|(?:com|in|org|net|co|io|ly|be|me|gov|edu)\b)',
+    regex.IGNORECASE
+)
+
+# Hashtags and mentions first, then words of one script at a time, so mixed-script
+# runs split into their Devanagari, Tamil and Latin parts. Script classes include
+# the vowel signs and viramas, and normalize_text has already removed ZWNJ/ZWJ.
+# Latin words may carry an apostrophe (don't, modi's).
+TOKEN_PATTERN = regex.compile(
+    r"(?P<hashtag>#[\p{L}\p{M}\p{N}_]+)"
+    r"|(?P<mention>@[A-Za-z0-9_]+)"
+    r"|(?P<word>[\p{Devanagari}]+|[\p{Tamil}]+|[\p{Latin}\p{N}]+(?:['’][\p{Latin}]+)*)"
+)
+
+# Function words left out of unigrams and bigrams
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have he her his i if in is it its me my no not of on or our so
+that the their them they this to too was we were what when which who why will with you your rt amp
+का की के को है हैं में से और भी तो ही ये यह वो वह पर था थी थे हो कि ने एक नहीं क्या कर जो इस उस
+ஒரு இது அது என்று மற்றும் இந்த அந்த தான் உள்ள ஆனால் என்ன
+""".split())
+
+TIME_BUCKETS = {'day': 10, 'month': 7, 'year': 4}
+
+def tokenize(text):
+    """Split a comment into (hashtags, mentions, words), lowercasing Latin and NFC-normalizing all scripts"""
+    hashtags, mentions, words = [], [], []
+    for match in TOKEN_PATTERN.finditer(URL_PATTERN.sub(' ', normalize_text(text or ''))):
+        token = match.group().lower()
+        if match.lastgroup == 'hashtag':
+            hashtags.append(token)
+        elif match.lastgroup == 'mention':
+            mentions.append(token)
+        elif not token.isdigit():
+            words.append(token)
+    return hashtags, mentions, words
+
+def time_bucket(comment_time, bucket='month'):
+    """'2025-02' style bucket of an ISO comment time (or 'unknown')"""
+    if not comment_time or len(comment_time) < TIME_BUCKETS[bucket]:
+        return 'unknown'
+    return comment_time[:TIME_BUCKETS[bucket]]
+
+class SpaceSaving:
+    """Space-saving top-k summary: at most `capacity` counters, counts are upper bounds.
+
+    An item's true count lies in [count - error, count]. Summaries built with
+    the same capacity merge into one with the same guarantee.
+    """
+
+    def __init__(self, capacity=200):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        # Lazy min-heap of (count, item); stale entries are skipped on eviction
+        self.heap = []
+
+    def min_count(self):
+        """Upper bound on the count of any item not being tracked"""
+        if len(self.counts) < self.capacity:
+            return 0
+        while self.heap[0][0] != self.counts.get(self.heap[0][1]):
+            heapq.heappop(self.heap)
+        return self.heap[0][0]
+
+    def offer(self, item, count=1):
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            floor = self.min_count()
+            _, evicted = heapq.heappop(self.heap)
+            del self.counts[evicted]
+            del self.errors[evicted]
+            self.counts[item] = floor + count
+            self.errors[item] = floor
+        heapq.heappush(self.heap, (self.counts[item], item))
+        if len(self.heap) > 4 * self.capacity + 64:
+            self.heap = [(value, key) for key, value in self.counts.items()]
+            heapq.heapify(self.heap)
+
+    def merge(self, other):
+        """Fold another summary into this one"""
+        own_floor, other_floor = self.min_count(), other.min_count()
+        merged = {}
+        for item in set(self.counts) | set(other.counts):
+            count = self.counts.get(item, own_floor) + other.counts.get(item, other_floor)
+            error = self.errors.get(item, own_floor) + other.errors.get(item, other_floor)
+            merged[item] = (count, error)
+        kept = heapq.nlargest(self.capacity, merged.items(), key=lambda entry: entry[1][0])
+        self.counts = {item: count for item, (count, _) in kept}
+        self.errors = {item: error for item, (_, error) in kept}
+        self.heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self.heap)
+        return self
+
+    def top(self, n=20):
+        """[(item, count, error)] for the n largest counts"""
+        return [(item, count, self.errors[item])
+                for item, count in heapq.nlargest(n, self.counts.items(), key=lambda entry: entry[1])]
+
+    def to_dict(self):
+        return {'capacity': self.capacity, 'items': [[item, count, self.errors[item]] for item, count in
+                                                     self.counts.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        summary = cls(data['capacity'])
+        for item, count, error in data['items']:
+            summary.counts[item] = count
+            summary.errors[item] = error
+        summary.heap = [(count, item) for item, count in summary.counts.items()]
+        heapq.heapify(summary.heap)
+        return summary
+
+class CountMinSketch:
+    """Fixed-size frequency estimates for any term (never under-counts); mergeable by addition"""
+
+    def __init__(self, width=1 << 16, depth=4):
+        if not 1 <= depth <= 8:
+            raise ValueError("Sketch depth must be between 1 and 8 (one 64-bit digest word per row)")
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    def cells(self, item):
+        # One independent 64-bit word of a single blake2b digest per row. Seeding one CRC per row
+        # is not enough: CRC is affine in its seed, so keys colliding in one row collide in all
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=8 * self.depth).digest()
+        return [int.from_bytes(digest[8 * row:8 * row + 8], 'little') % self.width for row in range(self.depth)]
+
+    def add(self, item, count=1):
+        for row, cell in enumerate(self.cells(item)):
+            self.table[row, cell] += count
+
+    def estimate(self, item):
+        return int(min(self.table[row, cell] for row, cell in enumerate(self.cells(item))))
+
+    def merge(self, other):
+        self.table += other.table
+        return self
+
+class CommentAnalytics:
+    """Mergeable hashtag, mention, unigram and bigram counts per channel and time bucket.
+
+    Top-k summaries are kept for every (kind, channel, bucket), with '*' standing
+    for all channels or all buckets. Count-min sketches give estimates for terms
+    outside the top-k. Hashtag co-occurrence is counted sparsely over pairs of
+    hashtag ids.
+    """
+
+    def __init__(self, capacity=200, overall_capacity=5000, bucket='month', sketch_width=1 << 16, sketch_depth=4):
+        self.capacity = capacity
+        self.overall_capacity = overall_capacity
+        self.bucket = bucket
+        self.summaries = {}
+        self.sketches = {kind: CountMinSketch(sketch_width, sketch_depth) for kind in KINDS}
+        self.hashtag_ids = {}
+        self.cooccurrence = Counter()
+        self.comments = 0
+
+    def summary(self, kind, channel, bucket):
+        key = (kind, channel, bucket)
+        if key not in self.summaries:
+            overall = channel == ALL and bucket == ALL
+            self.summaries[key] = SpaceSaving(self.overall_capacity if overall else self.capacity)
+        return self.summaries[key]
+
+    def count(self, kind, terms, channel, bucket):
+        if not terms:
+            return
+        counts = Counter(terms)
+        sketch = self.sketches[kind]
+        for scope in ((ALL, ALL), (channel, ALL), (ALL, bucket), (channel, bucket)):
+            summary = self.summary(kind, *scope)
+            for term, count in counts.items():
+                summary.offer(term, count)
+        for term, count in counts.items():
+            sketch.add(term, count)
+
+    def add_comment(self, text, channel, comment_time=None):
+        hashtags, mentions, words = tokenize(text)
+        channel = channel or 'unknown'
+        bucket = time_bucket(comment_time, self.bucket)
+        unigrams = [word for word in words if word not in STOPWORDS]
+        bigrams = [f'{first} {second}' for first, second in zip(words, words[1:])
+                   if first not in STOPWORDS and second not in STOPWORDS]
+        self.count('hashtags', hashtags, channel, bucket)
+        self.count('mentions', mentions, channel, bucket)
+        self.count('unigrams', unigrams, channel, bucket)
+        self.count('bigrams', bigrams, channel, bucket)
+
+        ids = sorted({self.hashtag_ids.setdefault(tag, len(self.hashtag_ids)) for tag in hashtags})
+        for i, first in enumerate(ids):
+            for second in ids[i + 1:]:
+                self.cooccurrence[(first, second)] += 1
+        self.comments += 1
+
+    def add_conversation(self, data):
+        channel = data.get('channel_name')
+        for comment in data.get('comments', []):
+            self.add_comment(comment.get('text'), channel, comment.get('comment_time'))
+
+    def merge(self, other):
+        """Fold another partial result (e.g. from another process) into this one"""
+        for key, summary in other.summaries.items():
+            if key in self.summaries:
+                self.summaries[key].merge(summary)
+            else:
+                self.summaries[key] = summary
+        for kind, sketch in other.sketches.items():
+            self.sketches[kind].merge(sketch)
+        # Re-number the other side's hashtags into this vocabulary
+        remap = {index: self.hashtag_ids.setdefault(tag, len(self.hashtag_ids))
+                 for tag, index in other.hashtag_ids.items()}
+        for (first, second), count in other.cooccurrence.items():
+            first, second = sorted((remap[first], remap[second]))
+            self.cooccurrence[(first, second)] += count
+        self.comments += other.comments
+        return self
+
+    def top(self, kind, n=20, channel=ALL, bucket=ALL):
+        """[(term, count, error)] for the most frequent terms of a kind in a channel/bucket"""
+        summary = self.summaries.get((kind, channel, bucket))
+        return summary.top(n) if summary else []
+
+    def estimate(self, kind, term):
+        """Overall count of any term, from the count-min sketch"""
+        return self.sketches[kind].estimate(term)
+
+    def cooccurrence_matrix(self):
+        """Hashtag co-occurrence as (vocabulary, rows, cols, counts) COO arrays, upper triangle only"""
+        vocabulary = sorted(self.hashtag_ids, key=self.hashtag_ids.get)
+        pairs = np.array(list(self.cooccurrence), dtype=np.int32).reshape(-1, 2)
+        counts = np.fromiter(self.cooccurrence.values(), dtype=np.int64, count=len(self.cooccurrence))
+        return vocabulary, pairs[:, 0], pairs[:, 1], counts
+
+    def top_cooccurrences(self, n=20):
+        vocabulary = sorted(self.hashtag_ids, key=self.hashtag_ids.get)
+        return [(vocabulary[first], vocabulary[second], count)
+                for (first, second), count in self.cooccurrence.most_common(n)]
+
+    def to_dict(self):
+        """JSON-friendly top-k summaries and co-occurrence (sketches are not saved)"""
+        vocabulary, rows, cols, counts = self.cooccurrence_matrix()
+        return {
+            'comments': self.comments,
+            'bucket': self.bucket,
+            'summaries': [{'kind': kind, 'channel': channel, 'bucket': bucket, **summary.to_dict()}
+                          for (kind, channel, bucket), summary in sorted(self.summaries.items())],
+            'hashtag_cooccurrence': {'vocabulary': vocabulary, 'rows': rows.tolist(), 'cols': cols.tolist(),
+                                     'counts': counts.tolist()},
+        }
+
+def conversation_files(input_folder):
+    return sorted(os.path.join(input_folder, name) for name in os.listdir(input_folder)
+                  if name.endswith('.json') and not name.startswith(COMBINED_BASENAME))
+
+def analyze_files(paths, options):
+    """Partial result over some processed_json/ files; run once per worker process"""
+    analytics = CommentAnalytics(**options)
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            document = json.load(f)
+        for data in document.values():
+            analytics.add_conversation(data)
+    return analytics
+
+def analyze(input_folder='processed_json', workers=None, **options):
+    """Stream processed_json/ through CommentAnalytics, sharding files across worker processes"""
+    paths = conversation_files(input_folder)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) < 2:
+        return analyze_files(paths, options)
+    shards = [paths[i::workers] for i in range(workers) if paths[i::workers]]
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        partials = list(executor.map(analyze_files, shards, [options] * len(shards)))
+    result = partials[0]
+    for partial in partials[1:]:
+        result.merge(partial)
+    return result
+
+def print_top(analytics, n, channel=ALL, bucket=ALL):
+    for kind in KINDS:
+        terms = ', '.join(f'{term} ({count})' for term, count, _ in analytics.top(kind, n, channel, bucket))
+        print(f"  {kind:<9} {terms}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Hashtag, mention and n-gram counts over processed comments')
+    parser.add_argument('--input', default='processed_json')
+    parser.add_argument('--output', default=ANALYTICS_FILE)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--bucket', choices=list(TIME_BUCKETS), default='month')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--channel', action='append', help='Also show the top terms for this channel')
+    args = parser.parse_args()
+
+    analytics = analyze(args.input, args.workers, bucket=args.bucket)
+    print(f"{analytics.comments} comments")
+    print("All channels:")
+    print_top(analytics, args.top)
+    for channel in args.channel or []:
+        print(f"{channel}:")
+        print_top(analytics, args.top, channel)
+    print("Hashtag pairs: " + ', '.join(f'{first}+{second} ({count})'
+                                        for first, second, count in analytics.top_cooccurrences(args.top)))
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(analytics.to_dict(), f, ensure_ascii=False)
+    print(f"Saved summaries to {args.output}")
@@ -0,0 +1,88 @@
+import unicodedata
+import numpy as np
+import regex
+
+# With pyarrow installed, column normalization and dedupe run as Arrow compute kernels;
+# without it the same steps run over Python lists with identical results
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = pc = None
+
+# Compiled once and shared by every call
+VALID_COMMENT_PATTERN = regex.compile(r'\p{L}|\p{N}')
+
+# Zero-width and invisible formatting characters that make otherwise identical
+# replies look different (ZWSP, ZWNJ, ZWJ, word joiner, BOM, soft hyphen)
+ZERO_WIDTH_PATTERN = regex.compile('[\u200b\u200c\u200d\u2060\ufeff\u00ad]+')
+
+# Joins a column into one string so zero-width removal runs once per batch.
+# NUL is a normalization starter, so NFC never combines across it.
+COLUMN_SEPARATOR = '\x00'
+
+def normalize_text(text):
+    """Dedupe form of a comment: NFC, zero-width characters removed, whitespace collapsed"""
+    return ' '.join(ZERO_WIDTH_PATTERN.sub('', unicodedata.normalize('NFC', text)).split())
+
+def normalize_array(array):
+    """normalize_text over an Arrow string array, as Arrow compute kernels"""
+    array = pc.utf8_normalize(array.fill_null(''), 'NFC')
+    array = pc.replace_substring_regex(array, ZERO_WIDTH_PATTERN.pattern, '')
+    # Splitting on whitespace collapses inner runs but leaves empty tokens at either end; the trim drops them
+    array = pc.binary_join(pc.utf8_split_whitespace(array), pa.scalar(' ', array.type))
+    return pc.utf8_trim(array, ' ')
+
+def normalize_column(texts):
+    """normalize_text over a whole column, with one pass per step over the batch"""
+    if pa is not None:
+        return normalize_array(pa.array(texts, pa.large_string())).to_pylist()
+    texts = [unicodedata.normalize('NFC', text or '') for text in texts]
+    blob = COLUMN_SEPARATOR.join(texts)
+    if blob.count(COLUMN_SEPARATOR) != max(len(texts) - 1, 0):
+        # A text contains the separator itself; fall back to per-text normalization
+        return [normalize_text(text) for text in texts]
+    blob = ZERO_WIDTH_PATTERN.sub('', blob)
+    return [' '.join(part.split()) for part in blob.split(COLUMN_SEPARATOR)] if texts else []
+
+def distinct_normalized(texts):
+    """(rows, keys): each distinct normalized text and the first row it appears in, rows ascending.
+
+    Exact duplicates are collapsed first, so each distinct raw text is normalized once.
+    """
+    if pa is not None:
+        # Dictionary codes follow first appearance, so first rows ascend with the code
+        encoded = pa.array(texts, pa.large_string()).fill_null('').dictionary_encode()
+        _, raw_rows = np.unique(encoded.indices.to_numpy(), return_index=True)
+        normalized = normalize_array(encoded.dictionary).dictionary_encode()
+        _, first = np.unique(normalized.indices.to_numpy(), return_index=True)
+        return raw_rows[first], normalized.dictionary.to_pylist()
+    if None in texts:
+        texts = [text or '' for text in texts]
+    raw_rows = dict(zip(reversed(texts), range(len(texts) - 1, -1, -1)))
+    values = list(dict.fromkeys(texts))
+    normalized = normalize_column(values)
+    # Values are in order of first appearance, so assigning in reverse leaves each key its earliest row
+    rows = dict(zip(reversed(normalized), reversed(list(map(raw_rows.__getitem__, values)))))
+    keys = list(dict.fromkeys(normalized))
+    return np.fromiter(map(rows.__getitem__, keys), np.int64, len(keys)), keys
+
+def clean_comment_texts(texts, seen=None):
+    """Normalize, validity-filter and dedupe a column of comment texts.
+
+    Returns the indices of the texts to keep, in order: the first occurrence of
+    each normalized text that contains at least one letter or number. Dedupe
+    keys are the normalized strings themselves; pass the same `seen` set across
+    calls to dedupe over several batches in one process.
+    """
+    if seen is None:
+        seen = set()
+    if not len(texts):
+        return []
+    rows, keys = distinct_normalized(texts)
+    keep = np.fromiter(map(bool, map(VALID_COMMENT_PATTERN.search, keys)), bool, len(keys))
+    if seen:
+        keep &= ~np.fromiter(map(seen.__contains__, keys), bool, len(keys))
+    kept = np.flatnonzero(keep).tolist()
+    seen.update(map(keys.__getitem__, kept))
+    return rows[kept].tolist()
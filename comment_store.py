@@ -0,0 +1,106 @@
+import hashlib
+
+def comment_key(status_id, text, user_name, comment_time):
+    """Stable dedupe key: the reply's status ID if known, otherwise a hash of text/user/time"""
+    if status_id:
+        return str(status_id)
+    raw = '\x1f'.join(value or '' for value in (text, user_name, comment_time))
+    return 'h' + hashlib.blake2b(raw.encode('utf-8'), digest_size=12).hexdigest()
+
+def status_id_from_permalink(permalink):
+    """Extract the status ID from a reply permalink like /user/status/123 (or None)"""
+    if not permalink or '/status/' not in permalink:
+        return None
+    status_id = permalink.split('/status/', 1)[1].split('/')[0].split('?')[0]
+    return status_id if status_id.isdigit() else None
+
+class CommentRecord:
+    """Single scraped reply; __slots__ keeps per-record memory small on long threads"""
+    __slots__ = ('key', 'status_id', 'text', 'user_name', 'user_handle', 'comment_time', 'scrape_time',
+                 'like_count', 'reply_count', 'retweet_count')
+
+    def __init__(self, key, status_id, text, user_name, user_handle, comment_time, scrape_time,
+                 like_count=None, reply_count=None, retweet_count=None):
+        self.key = key
+        self.status_id = status_id
+        self.text = text
+        self.user_name = user_name
+        self.user_handle = user_handle
+        self.comment_time = comment_time
+        self.scrape_time = scrape_time
+        # Engagement counts are only known when replies come from network capture
+        self.like_count = like_count
+        self.reply_count = reply_count
+        self.retweet_count = retweet_count
+
+    @classmethod
+    def from_dict(cls, comment):
+        """Build a record from the comment dicts produced by the extraction functions"""
+        status_id = comment.get('status_id')
+        return cls(
+            comment_key(status_id, comment.get('text'), comment.get('user_name'), comment.get('comment_time')),
+            status_id,
+            comment.get('text'),
+            comment.get('user_name'),
+            comment.get('user_handle'),
+            comment.get('comment_time'),
+            comment.get('scrape_time'),
+            comment.get('like_count'),
+            comment.get('reply_count'),
+            comment.get('retweet_count')
+        )
+
+    def to_dict(self):
+        """Convert back to the comment dict layout written to new_data/"""
+        comment = {
+            'text': self.text,
+            'user_name': self.user_name,
+            'user_handle': self.user_handle,
+            'comment_time': self.comment_time,
+            'scrape_time': self.scrape_time,
+            'status_id': self.status_id
+        }
+        if self.like_count is not None or self.reply_count is not None or self.retweet_count is not None:
+            comment['like_count'] = self.like_count
+            comment['reply_count'] = self.reply_count
+            comment['retweet_count'] = self.retweet_count
+        return comment
+
+class CommentStore:
+    """Insertion-ordered, deduplicated store of the replies seen for one conversation"""
+
+    def __init__(self):
+        self.records = []
+        self.keys = set()
+        self.last_added = 0
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, comment):
+        """Add one comment dict; returns True if it was a new unique reply"""
+        if not comment.get('text'):
+            return False
+        record = CommentRecord.from_dict(comment)
+        if record.key in self.keys:
+            return False
+        self.keys.add(record.key)
+        self.records.append(record)
+        return True
+
+    def add_many(self, comments):
+        """Add a pass of extracted comments; returns (and remembers) how many were new"""
+        added = 0
+        for comment in comments:
+            if self.add(comment):
+                added += 1
+        self.last_added = added
+        return added
+
+    def new_since(self, count):
+        """Comment dicts added after the store held `count` records"""
+        return [record.to_dict() for record in self.records[count:]]
+
+    def to_list(self):
+        """All comments as dicts, in the order they were first seen"""
+        return [record.to_dict() for record in self.records]
@@ -0,0 +1,288 @@
+import argparse
+import json
+import os
+import sqlite3
+import unicodedata
+
+from processed_files import COMBINED_BASENAME
+
+CORPUS_DB = 'corpus.db'
+
+# Folders ingested by default, each in its own layout:
+#   new_data/        scraper output, comments nested under comments.comments
+#   json_data/       older scrapes, flat comments list of {text, timestamp}
+#   processed_json/  cleaned output, one {conversation_id: data} document per file
+SOURCES = ('new_data', 'json_data', 'processed_json')
+
+# Files ingested per transaction
+BATCH_SIZE = 50
+
+# unicode61 splits words at Indic vowel signs and viramas unless they count as
+# token characters; ZWNJ/ZWJ also occur inside Devanagari and Tamil words
+INDIC_TOKENCHARS = ''.join(chr(c) for c in range(0x0900, 0x0E00)
+                           if unicodedata.category(chr(c)) in ('Mn', 'Mc')) + '\u200c\u200d'
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    conversation_ids TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS conversations (
+    source TEXT NOT NULL,
+    conversation_id TEXT NOT NULL,
+    channel TEXT,
+    url TEXT,
+    scrape_start_time TEXT,
+    total_comments INTEGER,
+    PRIMARY KEY (source, conversation_id)
+);
+CREATE TABLE IF NOT EXISTS posts (
+    source TEXT NOT NULL,
+    conversation_id TEXT NOT NULL,
+    text TEXT,
+    user_name TEXT,
+    post_time TEXT,
+    PRIMARY KEY (source, conversation_id)
+);
+CREATE TABLE IF NOT EXISTS comments (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    conversation_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    comment_id TEXT,
+    channel TEXT,
+    text TEXT,
+    user_name TEXT,
+    comment_time TEXT,
+    scrape_time TEXT,
+    UNIQUE (source, conversation_id, position)
+);
+CREATE INDEX IF NOT EXISTS conversations_channel ON conversations (channel);
+CREATE INDEX IF NOT EXISTS posts_time ON posts (post_time);
+CREATE INDEX IF NOT EXISTS comments_channel_time ON comments (channel, comment_time);
+CREATE INDEX IF NOT EXISTS comments_time ON comments (comment_time);
+CREATE VIRTUAL TABLE IF NOT EXISTS comments_fts USING fts5 (
+    text, content='comments', content_rowid='id',
+    tokenize="unicode61 tokenchars '{INDIC_TOKENCHARS}'"
+);
+CREATE TRIGGER IF NOT EXISTS comments_fts_insert AFTER INSERT ON comments BEGIN
+    INSERT INTO comments_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS comments_fts_delete AFTER DELETE ON comments BEGIN
+    INSERT INTO comments_fts (comments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+def connect(db_file=CORPUS_DB):
+    """Open (and if needed create) the corpus database"""
+    conn = sqlite3.connect(db_file)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def channel_from_url(url):
+    """Channel name from a status URL like https://x.com/<channel>/status/<id>"""
+    parts = (url or '').split('/')
+    return parts[3] if len(parts) > 3 else None
+
+def normalize_scraped(data, comments, post=None):
+    """Common (conversation, post, comments) form of a new_data/ or json_data/ document"""
+    url = data.get('url')
+    conversation = {
+        'conversation_id': str(data.get('conversation_id')),
+        'channel': data.get('channel_name') or channel_from_url(url),
+        'url': url,
+        'scrape_start_time': data.get('scrape_start_time'),
+        'total_comments': data.get('total_comments'),
+    }
+    rows = [{
+        'comment_id': c.get('status_id'),
+        'text': c.get('text'),
+        'user_name': c.get('user_name'),
+        'comment_time': c.get('comment_time'),
+        # json_data/ only has the time each reply was scraped
+        'scrape_time': c.get('scrape_time') or c.get('timestamp'),
+    } for c in comments]
+    return conversation, post, rows
+
+def normalize_document(source, document):
+    """Yield (conversation, post, comments) for every conversation in one file of `source`"""
+    if not isinstance(document, dict):
+        return
+    if source == 'processed_json':
+        for conversation_id, data in document.items():
+            post = data.get('post') or {}
+            conversation = {
+                'conversation_id': str(conversation_id),
+                'channel': data.get('channel_name') or channel_from_url(data.get('url')),
+                'url': data.get('url'),
+                'scrape_start_time': None,
+                'total_comments': data.get('total_comments'),
+            }
+            rows = [{
+                'comment_id': c.get('comment_id'),
+                'text': c.get('text'),
+                'user_name': c.get('user_name'),
+                'comment_time': c.get('comment_time'),
+                'scrape_time': None,
+            } for c in data.get('comments', [])]
+            yield conversation, post, rows
+    elif 'conversation_id' in document:
+        comments = document.get('comments', [])
+        if isinstance(comments, dict):
+            # new_data/ layout: {'post': {...}, 'comments': [...]}
+            yield normalize_scraped(document, comments.get('comments', []), comments.get('post'))
+        else:
+            yield normalize_scraped(document, comments)
+
+def list_source_files(source, folder):
+    """JSON files of one source folder, skipping the combined output and URL lists"""
+    if not os.path.isdir(folder):
+        return []
+    return sorted(os.path.join(folder, name) for name in os.listdir(folder)
+                  if name.endswith('.json') and not name.startswith(COMBINED_BASENAME)
+                  and name != 'processed_urls.json')
+
+def delete_conversations(conn, source, conversation_ids):
+    for conversation_id in conversation_ids:
+        key = (source, conversation_id)
+        conn.execute("DELETE FROM comments WHERE source = ? AND conversation_id = ?", key)
+        conn.execute("DELETE FROM posts WHERE source = ? AND conversation_id = ?", key)
+        conn.execute("DELETE FROM conversations WHERE source = ? AND conversation_id = ?", key)
+
+def insert_conversation(conn, source, conversation, post, comments):
+    conversation_id = conversation['conversation_id']
+    conn.execute(
+        "INSERT OR REPLACE INTO conversations VALUES (?, ?, ?, ?, ?, ?)",
+        (source, conversation_id, conversation['channel'], conversation['url'],
+         conversation['scrape_start_time'], conversation['total_comments']))
+    if post:
+        conn.execute("INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?, ?)",
+                     (source, conversation_id, post.get('text'), post.get('user_name'), post.get('post_time')))
+    conn.executemany(
+        "INSERT INTO comments (source, conversation_id, position, comment_id, channel, text, user_name, "
+        "comment_time, scrape_time) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(source, conversation_id, position, c['comment_id'], conversation['channel'], c['text'],
+          c['user_name'], c['comment_time'], c['scrape_time']) for position, c in enumerate(comments)])
+
+def ingest(conn, folders=None, batch_size=BATCH_SIZE):
+    """Sync the database with the JSON files on disk; returns (files ingested, files removed).
+
+    Idempotent: files whose size and mtime match the last ingest are skipped,
+    changed files replace the rows they produced before, and rows of deleted
+    files are dropped. Files are loaded `batch_size` per transaction.
+    """
+    folders = folders or {source: source for source in SOURCES}
+    known = {path: (size, mtime_ns, json.loads(ids))
+             for path, size, mtime_ns, ids in conn.execute("SELECT path, size, mtime_ns, conversation_ids FROM files")}
+    seen = set()
+    pending = []
+    for source, folder in folders.items():
+        for path in list_source_files(source, folder):
+            seen.add(path)
+            stat = os.stat(path)
+            if known.get(path, (None, None))[:2] != (stat.st_size, stat.st_mtime_ns):
+                pending.append((source, path, stat))
+
+    ingested = 0
+    for start in range(0, len(pending), batch_size):
+        with conn:
+            for source, path, stat in pending[start:start + batch_size]:
+                if path in known:
+                    delete_conversations(conn, source, known[path][2])
+                with open(path, 'r', encoding='utf-8') as f:
+                    document = json.load(f)
+                conversation_ids = []
+                for conversation, post, comments in normalize_document(source, document):
+                    delete_conversations(conn, source, [conversation['conversation_id']])
+                    insert_conversation(conn, source, conversation, post, comments)
+                    conversation_ids.append(conversation['conversation_id'])
+                conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                             (path, source, stat.st_size, stat.st_mtime_ns, json.dumps(conversation_ids)))
+                ingested += 1
+
+    removed = [path for path in known if path not in seen
+               and any(path.startswith(os.path.join(folder, '')) for folder in folders.values())]
+    with conn:
+        for path in removed:
+            source = conn.execute("SELECT source FROM files WHERE path = ?", (path,)).fetchone()[0]
+            delete_conversations(conn, source, known[path][2])
+            conn.execute("DELETE FROM files WHERE path = ?", (path,))
+    return ingested, len(removed)
+
+def fts_query(text):
+    """Turn plain search text into an FTS5 query matching all of its words"""
+    return ' '.join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+def search(conn, text=None, channels=None, since=None, until=None, source=None, match=None, limit=100):
+    """Comments matching `text` (all words) or a raw FTS5 `match` expression, filtered by channel and time.
+
+    since/until compare against comment_time as ISO strings, so '2025-02-01' works.
+    Returns dicts ordered by comment_time.
+    """
+    clauses, params = [], []
+    if text or match:
+        clauses.append("c.id IN (SELECT rowid FROM comments_fts WHERE comments_fts MATCH ?)")
+        params.append(match or fts_query(text))
+    if channels:
+        clauses.append(f"c.channel IN ({', '.join('?' * len(channels))})")
+        params.extend(channels)
+    if since:
+        clauses.append("c.comment_time >= ?")
+        params.append(since)
+    if until:
+        clauses.append("c.comment_time < ?")
+        params.append(until)
+    if source:
+        clauses.append("c.source = ?")
+        params.append(source)
+    where = ('WHERE ' + ' AND '.join(clauses)) if clauses else ''
+    params.append(limit)
+    cursor = conn.execute(
+        "SELECT c.source, c.channel, c.conversation_id, c.comment_id, c.user_name, c.comment_time, c.text "
+        f"FROM comments c {where} ORDER BY c.comment_time LIMIT ?", params)
+    columns = [description[0] for description in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor]
+
+def stats(conn):
+    """Row counts per source"""
+    counts = {source: {'conversations': conversations, 'comments': 0} for source, conversations in conn.execute(
+        "SELECT source, COUNT(*) FROM conversations GROUP BY source")}
+    for source, comments in conn.execute("SELECT source, COUNT(*) FROM comments GROUP BY source"):
+        counts[source]['comments'] = comments
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite corpus store for scraped conversations')
+    parser.add_argument('--db', default=CORPUS_DB)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('ingest', help='Load new_data/, json_data/ and processed_json/ into the database')
+    commands.add_parser('stats', help='Show row counts per source')
+    query = commands.add_parser('search', help='Full-text search over comment text')
+    query.add_argument('text', nargs='?')
+    query.add_argument('--channel', action='append')
+    query.add_argument('--since')
+    query.add_argument('--until')
+    query.add_argument('--source', choices=SOURCES)
+    query.add_argument('--match', help='Raw FTS5 query, e.g. "hindi OR tamil"')
+    query.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    if args.command == 'ingest':
+        ingested, removed = ingest(conn)
+        print(f"Ingested {ingested} changed files, removed {removed} deleted files")
+        print(json.dumps(stats(conn), indent=2))
+    elif args.command == 'stats':
+        print(json.dumps(stats(conn), indent=2))
+    else:
+        for row in search(conn, args.text, args.channel, args.since, args.until, args.source, args.match, args.limit):
+            print(json.dumps(row, ensure_ascii=False))
+    conn.close()
+
+if __name__ == "__main__":
+    main()
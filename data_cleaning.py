@@ -1,19 +1,36 @@
 import os
 import json
 
+from job_state import JOBS_FILE, JobStore
+from processed_files import COMBINED_BASENAME
+
 input_folder = 'processed_json'
+empty_urls = []
 
 for filename in os.listdir(input_folder):
-    if filename.endswith('.json'):
+    if filename.endswith('.json') and not filename.startswith(COMBINED_BASENAME):
         input_path = os.path.join(input_folder, filename)
         with open(input_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        comments_data = data.get('comments', [])
-        # If comments_data is a dict, get the 'comments' list inside it
-        if isinstance(comments_data, dict):
-            comments = comments_data.get('comments', [])
-        else:
-            comments = comments_data
-        url = data.get('url', '')
-        if isinstance(comments, list) and len(comments) == 0:
-            print(url)
\ No newline at end of file
+            document = json.load(f)
+        # Processed files hold {conversation_id: conversation}
+        for conversation_id, data in document.items():
+            comments_data = data.get('comments', [])
+            # If comments_data is a dict, get the 'comments' list inside it
+            if isinstance(comments_data, dict):
+                comments = comments_data.get('comments', [])
+            else:
+                comments = comments_data
+            url = data.get('url') or ''
+            if not url and data.get('channel_name'):
+                url = f"https://x.com/{data['channel_name']}/status/{conversation_id}"
+            if isinstance(comments, list) and len(comments) == 0:
+                print(url or conversation_id)
+                if url:
+                    empty_urls.append(url)
+
+# Hand empty conversations back to the scraper's retry scheduler instead of DataPaper.csv
+if empty_urls and os.path.exists(JOBS_FILE):
+    job_store = JobStore(JOBS_FILE)
+    reopened = job_store.reopen_empty(empty_urls)
+    job_store.close()
+    print(f"Queued {reopened} empty conversations for a retry in {JOBS_FILE}")
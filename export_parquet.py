@@ -0,0 +1,172 @@
+import argparse
+import os
+import shutil
+from datetime import datetime
+
+from processed_files import iter_conversations
+
+# pyarrow is only needed for this export; the rest of the pipeline runs without it
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+PARQUET_FOLDER = 'parquet'
+
+# Rows buffered per channel before a row group is written
+ROW_GROUP_SIZE = 50000
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow")
+
+def table_schemas():
+    """Column layout of the posts and comments tables; channel comes from the partition path"""
+    timestamp = pa.timestamp('ms', tz='UTC')
+    return {
+        'posts': pa.schema([
+            ('conversation_id', pa.string()),
+            ('url', pa.string()),
+            ('text', pa.string()),
+            ('user_name', pa.string()),
+            ('post_time', timestamp),
+            ('total_comments', pa.int32()),
+        ]),
+        'comments': pa.schema([
+            ('comment_id', pa.string()),
+            ('conversation_id', pa.string()),
+            ('text', pa.string()),
+            ('user_name', pa.string()),
+            ('comment_time', timestamp),
+            ('near_duplicate_cluster', pa.string()),
+        ]),
+    }
+
+def parse_timestamp(value):
+    """ISO time from X (e.g. 2019-06-03T07:04:16.000Z) as an aware datetime, or None"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        return None
+
+class PartitionWriter:
+    """Buffers one channel's rows for one table and writes them out a row group at a time"""
+
+    def __init__(self, path, schema, row_group_size=ROW_GROUP_SIZE, compression='zstd'):
+        self.path = path
+        self.schema = schema
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.columns = {name: [] for name in schema.names}
+        self.buffered = 0
+        self.rows = 0
+        self.writer = None
+
+    def add(self, row):
+        for name, values in self.columns.items():
+            values.append(row.get(name))
+        self.buffered += 1
+        if self.buffered >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffered:
+            return
+        if self.writer is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Written next to the final path and renamed on close, so readers never see a partial file
+            self.writer = pq.ParquetWriter(self.path + '.tmp', self.schema, compression=self.compression)
+        self.writer.write_table(pa.table(self.columns, schema=self.schema), row_group_size=self.buffered)
+        self.rows += self.buffered
+        self.columns = {name: [] for name in self.schema.names}
+        self.buffered = 0
+
+    def close(self):
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+            os.replace(self.path + '.tmp', self.path)
+        return self.rows
+
+def export_parquet(input_folder='processed_json', output_folder=PARQUET_FOLDER, row_group_size=ROW_GROUP_SIZE,
+                   compression='zstd'):
+    """Write posts and comments as Parquet tables partitioned by channel.
+
+    Layout is <output_folder>/<table>/channel=<name>/part-0.parquet. The JSON
+    outputs are left as they are; partitions that get no rows from the input,
+    such as a channel that no longer appears, are removed. Returns row counts
+    per table.
+    """
+    require_pyarrow()
+    schemas = table_schemas()
+    writers = {}
+
+    def writer_for(table, channel):
+        key = (table, channel)
+        if key not in writers:
+            path = os.path.join(output_folder, table, f'channel={channel}', 'part-0.parquet')
+            writers[key] = PartitionWriter(path, schemas[table], row_group_size, compression)
+        return writers[key]
+
+    for conversation_id, data in iter_conversations(input_folder):
+        channel = data.get('channel_name') or 'unknown'
+        post = data.get('post', {})
+        writer_for('posts', channel).add({
+            'conversation_id': conversation_id,
+            'url': data.get('url'),
+            'text': post.get('text'),
+            'user_name': post.get('user_name'),
+            'post_time': parse_timestamp(post.get('post_time')),
+            'total_comments': data.get('total_comments'),
+        })
+        comments = writer_for('comments', channel)
+        for comment in data.get('comments', []):
+            comments.add({
+                'comment_id': comment.get('comment_id'),
+                'conversation_id': conversation_id,
+                'text': comment.get('text'),
+                'user_name': comment.get('user_name'),
+                'comment_time': parse_timestamp(comment.get('comment_time')),
+                'near_duplicate_cluster': comment.get('near_duplicate_cluster'),
+            })
+
+    counts = {table: 0 for table in schemas}
+    written = set()
+    for key, writer in writers.items():
+        rows = writer.close()
+        counts[key[0]] += rows
+        if rows:
+            written.add(key)
+
+    # Drop partitions this export wrote no rows for: channels gone from the input, or
+    # channels whose conversations no longer have any comments
+    for table in schemas:
+        table_folder = os.path.join(output_folder, table)
+        if not os.path.isdir(table_folder):
+            continue
+        for partition in os.listdir(table_folder):
+            if partition.startswith('channel=') and (table, partition[len('channel='):]) not in written:
+                shutil.rmtree(os.path.join(table_folder, partition))
+
+    channels = len({channel for _, channel in written})
+    print(f"Exported {counts['posts']} posts and {counts['comments']} comments "
+          f"across {channels} channels to {output_folder}/")
+    return counts
+
+def read_table(table, columns=None, channels=None, output_folder=PARQUET_FOLDER):
+    """Read only the requested columns (and channels) of an exported table, memory-mapped"""
+    require_pyarrow()
+    filters = [('channel', 'in', list(channels))] if channels else None
+    return pq.read_table(os.path.join(output_folder, table), columns=columns, filters=filters,
+                         partitioning='hive', memory_map=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Export processed_json/ to Parquet tables partitioned by channel')
+    parser.add_argument('--input', default='processed_json')
+    parser.add_argument('--output', default=PARQUET_FOLDER)
+    parser.add_argument('--row-group-size', type=int, default=ROW_GROUP_SIZE)
+    args = parser.parse_args()
+    export_parquet(args.input, args.output, args.row_group_size)
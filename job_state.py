@@ -0,0 +1,221 @@
+import json
+import os
+import random
+import time
+
+JOBS_FILE = 'scrape_jobs.jsonl'
+
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+EMPTY = 'empty'
+FAILED = 'failed'
+
+class Job:
+    """Scrape state of one URL"""
+    __slots__ = ('url', 'status', 'attempts', 'last_error', 'reply_count', 'next_attempt_at', 'updated_at')
+
+    def __init__(self, url, status=PENDING, attempts=0, last_error=None, reply_count=None,
+                 next_attempt_at=None, updated_at=None):
+        self.url = url
+        self.status = status
+        self.attempts = attempts
+        self.last_error = last_error
+        self.reply_count = reply_count
+        # Epoch seconds when an empty/failed job may run again; None means no retry is scheduled
+        self.next_attempt_at = next_attempt_at
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['url'], data.get('status', PENDING), data.get('attempts', 0), data.get('last_error'),
+                   data.get('reply_count'), data.get('next_attempt_at'), data.get('updated_at'))
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class JobStore:
+    """Persistent per-URL job state, kept as an append-only JSONL log.
+
+    Every state change appends the job's full record; on load the last record
+    for each URL wins. The log is compacted on open once it holds many stale
+    records, so a run never rewrites the whole job list per URL.
+    """
+
+    def __init__(self, path=JOBS_FILE, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self.jobs = {}
+        self.log_lines = 0
+        self.needs_compaction = False
+        self.load()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, 'a', encoding='utf-8')
+        if self.needs_compaction or self.log_lines > 2 * len(self.jobs) + 100:
+            self.compact()
+
+    def load(self):
+        """Replay the log, skipping torn lines; jobs left running by a crash become retryable failures"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    job = Job.from_dict(json.loads(line))
+                except (ValueError, KeyError, TypeError):
+                    # Torn line from a crash; compaction drops it
+                    self.needs_compaction = True
+                    continue
+                self.jobs[job.url] = job
+                self.log_lines += 1
+        for job in self.jobs.values():
+            if job.status == RUNNING:
+                job.status = FAILED
+                job.last_error = 'interrupted'
+                job.next_attempt_at = self.clock()
+                self.needs_compaction = True
+
+    def write(self, job):
+        job.updated_at = self.clock()
+        self.file.write(json.dumps(job.to_dict(), ensure_ascii=False) + '\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.log_lines += 1
+
+    def compact(self):
+        """Atomically rewrite the log with one record per URL"""
+        self.file.close()
+        tmp_file = self.path + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for job in self.jobs.values():
+                f.write(json.dumps(job.to_dict(), ensure_ascii=False) + '\n')
+        os.replace(tmp_file, self.path)
+        self.file = open(self.path, 'a', encoding='utf-8')
+        self.log_lines = len(self.jobs)
+
+    def close(self):
+        self.file.close()
+
+    def get(self, url):
+        return self.jobs.get(url)
+
+    def add_urls(self, urls):
+        """Register URLs not seen before as pending; returns how many were new"""
+        added = 0
+        for url in urls:
+            if url not in self.jobs:
+                job = self.jobs[url] = Job(url)
+                self.write(job)
+                added += 1
+        return added
+
+    def import_finished(self, url, reply_count=None):
+        """Record a URL scraped before job tracking existed (from processed_urls.json)"""
+        if url in self.jobs:
+            return
+        status = EMPTY if reply_count == 0 else SUCCEEDED
+        job = self.jobs[url] = Job(url, status, attempts=1, reply_count=reply_count,
+                                   next_attempt_at=self.clock() if status == EMPTY else None)
+        self.write(job)
+
+    def start(self, url):
+        job = self.jobs.setdefault(url, Job(url))
+        job.status = RUNNING
+        job.attempts += 1
+        job.next_attempt_at = None
+        self.write(job)
+
+    def finish(self, url, status, reply_count=None, error=None, next_attempt_at=None):
+        job = self.jobs.setdefault(url, Job(url))
+        job.status = status
+        job.reply_count = reply_count
+        job.last_error = error
+        job.next_attempt_at = next_attempt_at
+        self.write(job)
+
+    def reopen_empty(self, urls):
+        """Mark finished URLs found to have no replies as empty and due for a retry; returns how many changed"""
+        reopened = 0
+        for url in urls:
+            job = self.jobs.get(url)
+            if job is not None and job.status == SUCCEEDED:
+                job.status = EMPTY
+                job.reply_count = 0
+                job.next_attempt_at = self.clock()
+                self.write(job)
+                reopened += 1
+        return reopened
+
+    def urls_with_status(self, *statuses):
+        return [url for url, job in self.jobs.items() if job.status in statuses]
+
+    def counts(self):
+        counts = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+class RetryScheduler:
+    """Picks the next URL to scrape: new URLs first, then due retries of empty/failed ones.
+
+    Empty and failed URLs are retried with exponential backoff and jitter until
+    they have been attempted `max_attempts` times.
+    """
+
+    def __init__(self, store, max_attempts=4, base_delay=600, max_delay=6 * 3600, jitter=0.25, rng=None):
+        self.store = store
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+
+    def backoff(self, attempts):
+        """Seconds to wait before attempt `attempts + 1`"""
+        delay = min(self.max_delay, self.base_delay * 2 ** max(attempts - 1, 0))
+        return delay * self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def due_urls(self):
+        """All runnable URLs: never-attempted ones in insertion order, then retries that are due, oldest first"""
+        now = self.store.clock()
+        new, retries = [], []
+        for job in self.store.jobs.values():
+            if job.status == PENDING:
+                new.append(job.url)
+            elif job.status in (EMPTY, FAILED) and job.next_attempt_at is not None and job.next_attempt_at <= now:
+                retries.append(job)
+        retries.sort(key=lambda job: job.next_attempt_at)
+        return new + [job.url for job in retries]
+
+    def next_url(self):
+        due = self.due_urls()
+        return due[0] if due else None
+
+    def next_wait(self):
+        """Seconds until the next scheduled retry becomes due, or None if nothing is left to retry"""
+        scheduled = [job.next_attempt_at for job in self.store.jobs.values()
+                     if job.status in (EMPTY, FAILED) and job.next_attempt_at is not None]
+        if not scheduled:
+            return None
+        return max(min(scheduled) - self.store.clock(), 0)
+
+    def started(self, url):
+        self.store.start(url)
+
+    def record(self, url, reply_count=None, error=None):
+        """Store the outcome of an attempt and schedule a retry if it came back empty or failed"""
+        if error is not None:
+            status = FAILED
+        elif reply_count == 0:
+            status = EMPTY
+        else:
+            status = SUCCEEDED
+        next_attempt_at = None
+        job = self.store.get(url)
+        attempts = job.attempts if job else 1
+        if status != SUCCEEDED and attempts < self.max_attempts:
+            next_attempt_at = self.store.clock() + self.backoff(attempts)
+        self.store.finish(url, status, reply_count, error, next_attempt_at)
+        return status
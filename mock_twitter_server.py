@@ -0,0 +1,316 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import argparse
+import json
+import random
+import threading
+import time
+
+# Local stand-in for x.com: login flow, home page, status pages with the same
+# data-testid markup the scraper reads, and a TweetDetail GraphQL endpoint that
+# feeds the page's infinite scroll (so network capture mode works too).
+
+SAMPLE_TEXTS = [
+    'Learning Hindi as a third language is not Imposition.',
+    'Bending on knees!! @HRDMinistry',
+    'इसलिए कहते हैं मेरा पंढरपुर से पुराना नाता है',
+    'पीएम मोदी ने कहा कि आरएसएस के माध्यम से ही उनका जुड़ाव हुआ',
+    'தமிழ் வாழ்க! மொழி திணிப்பு வேண்டாம்',
+    'இந்தி திணிப்பை எதிர்ப்போம் #StopHindiImposition',
+    'Good decision by the Centre 👍',
+]
+
+LOGIN_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Log in to X</title></head>
+<body>
+<div id="step"><input autocomplete="username" name="text"></div>
+<script>
+var step = document.getElementById('step');
+step.querySelector('input').addEventListener('keydown', function (event) {
+    if (event.key !== 'Enter') return;
+    setTimeout(function () {
+        step.innerHTML = '<input name="password" type="password">';
+        step.querySelector('input').addEventListener('keydown', function (event) {
+            if (event.key !== 'Enter') return;
+            document.cookie = 'auth_token=mock; path=/';
+            setTimeout(function () { window.location = '/home'; }, LATENCY_MS);
+        });
+    }, LATENCY_MS);
+});
+</script>
+</body></html>
+"""
+
+HOME_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Home / X</title></head>
+<body><nav><div data-testid="SideNav_AccountSwitcher_Button">mock account</div></nav></body></html>
+"""
+
+THREAD_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Post / X</title>
+<style>article { display: block; min-height: 140px; border-bottom: 1px solid #ccc; }</style>
+</head>
+<body>
+<main id="timeline"></main>
+<div id="spinner" role="progressbar" style="display: none">Loading</div>
+<script>
+var CONVERSATION_ID = 'CONVERSATION';
+var MONTHS = {Jan: '01', Feb: '02', Mar: '03', Apr: '04', May: '05', Jun: '06',
+              Jul: '07', Aug: '08', Sep: '09', Oct: '10', Nov: '11', Dec: '12'};
+var timeline = document.getElementById('timeline');
+var spinner = document.getElementById('spinner');
+var nextCursor = '0';
+var loading = false;
+
+function isoTime(createdAt) {
+    // 'Mon Jun 03 07:07:54 +0000 2019' -> '2019-06-03T07:07:54.000Z'
+    var p = createdAt.split(' ');
+    return p[5] + '-' + MONTHS[p[1]] + '-' + p[2] + 'T' + p[3] + '.000Z';
+}
+
+function escapeHtml(text) {
+    var div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+}
+
+function renderTweet(tweet) {
+    var user = tweet.core.user_results.result.legacy;
+    var legacy = tweet.legacy;
+    var article = document.createElement('article');
+    article.setAttribute('data-testid', 'tweet');
+    article.innerHTML =
+        '<div><div>' +
+        '<div data-testid="User-Name"><div class="r-1wbh5a2 r-dnmrzs"><span>' + escapeHtml(user.name) +
+        '</span><span>@' + escapeHtml(user.screen_name) + '</span></div>' +
+        '<a href="/' + user.screen_name + '/status/' + tweet.rest_id + '"><time datetime="' +
+        isoTime(legacy.created_at) + '">' + legacy.created_at + '</time></a></div>' +
+        '<div><div><div data-testid="tweetText">' + escapeHtml(legacy.full_text) + '</div></div></div>' +
+        '</div></div>';
+    timeline.appendChild(article);
+}
+
+function renderButton(label, cursor) {
+    var button = document.createElement('div');
+    button.setAttribute('role', 'button');
+    button.innerHTML = '<span>' + label + '</span>';
+    button.addEventListener('click', function () {
+        button.remove();
+        load(cursor);
+    });
+    timeline.appendChild(button);
+}
+
+function load(cursor) {
+    loading = true;
+    nextCursor = null;
+    spinner.style.display = 'block';
+    fetch('/i/api/graphql/mock/TweetDetail?focalTweetId=' + CONVERSATION_ID + '&cursor=' + encodeURIComponent(cursor))
+        .then(function (response) {
+            if (!response.ok) throw new Error('HTTP ' + response.status);
+            return response.json();
+        })
+        .then(function (payload) {
+            var instructions = payload.data.threaded_conversation_with_injections_v2.instructions;
+            instructions.forEach(function (instruction) {
+                (instruction.entries || []).forEach(function (entry) {
+                    var item = entry.content.itemContent;
+                    if (item.tweet_results) {
+                        renderTweet(item.tweet_results.result);
+                    } else if (item.cursorType === 'Bottom') {
+                        nextCursor = item.value;
+                    } else if (item.cursorType === 'ShowMoreThreads') {
+                        renderButton('Show more replies', item.value);
+                    } else if (item.cursorType === 'ShowMoreThreadsPrompt') {
+                        renderButton('Show probable spam', item.value);
+                    }
+                });
+            });
+        })
+        .catch(function () {
+            // Injected failure: let the next scroll retry the same page
+            nextCursor = cursor;
+        })
+        .then(function () {
+            loading = false;
+            spinner.style.display = 'none';
+        });
+}
+
+window.addEventListener('scroll', function () {
+    var bottom = window.innerHeight + window.scrollY;
+    if (!loading && nextCursor !== null && bottom >= document.documentElement.scrollHeight - 300) {
+        load(nextCursor);
+    }
+});
+
+load('0');
+</script>
+</body></html>
+"""
+
+class MockTwitterConfig:
+    """Knobs for the mock site: thread sizes, latency, reply gates and failure injection"""
+
+    def __init__(self, thread_size=200, page_size=20, latency=0.2, show_more_every=0, spam_replies=0,
+                 failure_rate=0.0, seed=1):
+        self.thread_size = thread_size
+        self.page_size = page_size
+        self.latency = latency
+        # Every Nth page is hidden behind a "Show more replies" button (0 = never)
+        self.show_more_every = show_more_every
+        # Extra replies hidden behind "Show probable spam" at the end of the thread
+        self.spam_replies = spam_replies
+        # Probability that a TweetDetail request fails with HTTP 500
+        self.failure_rate = failure_rate
+        self.seed = seed
+
+def twitter_time(timestamp):
+    return time.strftime('%a %b %d %H:%M:%S +0000 %Y', time.gmtime(timestamp))
+
+def make_tweet(conversation_id, status_id, name, screen_name, text, timestamp):
+    """Tweet object in the GraphQL shape network_capture.parse_reply_timeline expects"""
+    return {
+        '__typename': 'Tweet',
+        'rest_id': str(status_id),
+        'core': {'user_results': {'result': {'legacy': {'name': name, 'screen_name': screen_name}}}},
+        'legacy': {
+            'id_str': str(status_id),
+            'conversation_id_str': str(conversation_id),
+            'created_at': twitter_time(timestamp),
+            'full_text': text,
+            'favorite_count': status_id % 97,
+            'reply_count': status_id % 7,
+            'retweet_count': status_id % 13
+        }
+    }
+
+def build_thread(channel, conversation_id, config):
+    """Deterministic focal tweet, replies and spam replies for one conversation"""
+    rng = random.Random(f'{config.seed}:{conversation_id}')
+    conversation_id = int(conversation_id)
+    start = 1_600_000_000 + conversation_id % 10_000_000
+    focal = make_tweet(conversation_id, conversation_id, channel, channel,
+                       f'Mock post {conversation_id} #Hindi', start)
+    replies = []
+    for i in range(config.thread_size + config.spam_replies):
+        user = rng.randrange(1_000_000)
+        replies.append(make_tweet(conversation_id, conversation_id + 1 + i, f'User {user}', f'user_{user}',
+                                  f'{rng.choice(SAMPLE_TEXTS)} ({i})', start + 60 * (i + 1)))
+    return focal, replies[:config.thread_size], replies[config.thread_size:]
+
+def timeline_payload(entries):
+    return {'data': {'threaded_conversation_with_injections_v2': {'instructions': [
+        {'type': 'TimelineAddEntries', 'entries': entries}
+    ]}}}
+
+def tweet_entry(tweet):
+    return {'entryId': f"tweet-{tweet['rest_id']}",
+            'content': {'itemContent': {'itemType': 'TimelineTweet', 'tweet_results': {'result': tweet}}}}
+
+def cursor_entry(cursor_type, value):
+    return {'entryId': f'cursor-{cursor_type}-{value}',
+            'content': {'itemContent': {'itemType': 'TimelineTimelineCursor', 'cursorType': cursor_type,
+                                        'value': str(value)}}}
+
+def tweet_detail_page(channel, conversation_id, cursor, config):
+    """One page of the reply timeline; cursor '0' includes the focal tweet"""
+    focal, replies, spam = build_thread(channel, conversation_id, config)
+    if cursor == 'spam':
+        return timeline_payload([tweet_entry(t) for t in spam])
+    page = int(cursor)
+    entries = [tweet_entry(focal)] if page == 0 else []
+    start = page * config.page_size
+    entries += [tweet_entry(t) for t in replies[start:start + config.page_size]]
+    next_page = page + 1
+    if next_page * config.page_size < len(replies):
+        gated = config.show_more_every and next_page % config.show_more_every == 0
+        entries.append(cursor_entry('ShowMoreThreads' if gated else 'Bottom', next_page))
+    elif spam:
+        entries.append(cursor_entry('ShowMoreThreadsPrompt', 'spam'))
+    return timeline_payload(entries)
+
+class MockTwitterHandler(BaseHTTPRequestHandler):
+    config = MockTwitterConfig()
+    channels = {}
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, body, content_type='text/html; charset=utf-8', status=200):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def redirect(self, location):
+        self.send_response(302)
+        self.send_header('Location', location)
+        self.end_headers()
+
+    def logged_in(self):
+        return 'auth_token=' in self.headers.get('Cookie', '')
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        parts = [p for p in parsed.path.split('/') if p]
+        latency_ms = str(int(self.config.latency * 1000))
+
+        if parsed.path == '/i/flow/login':
+            self.send_body(LOGIN_HTML.replace('LATENCY_MS', latency_ms))
+        elif parsed.path in ('/', '/home'):
+            if self.logged_in():
+                self.send_body(HOME_HTML)
+            else:
+                self.redirect('/i/flow/login')
+        elif len(parts) == 3 and parts[1] == 'status' and parts[2].isdigit():
+            if not self.logged_in():
+                self.redirect('/i/flow/login')
+                return
+            self.channels[parts[2]] = parts[0]
+            self.send_body(THREAD_HTML.replace('CONVERSATION', parts[2]))
+        elif parsed.path.startswith('/i/api/graphql/') and parsed.path.endswith('/TweetDetail'):
+            query = parse_qs(parsed.query)
+            conversation_id = query.get('focalTweetId', ['0'])[0]
+            time.sleep(self.config.latency)
+            if self.server.rng.random() < self.config.failure_rate:
+                self.send_body('{"errors": [{"message": "Injected failure"}]}', 'application/json', 500)
+                return
+            payload = tweet_detail_page(self.channels.get(conversation_id, 'mock'), conversation_id,
+                                        query.get('cursor', ['0'])[0], self.config)
+            self.send_body(json.dumps(payload, ensure_ascii=False), 'application/json')
+        else:
+            self.send_body('Not found', 'text/plain', 404)
+
+def start_mock_server(config=None, host='127.0.0.1', port=0):
+    """Start the mock site in a background thread; returns (server, base_url)"""
+    handler = type('ConfiguredMockTwitterHandler', (MockTwitterHandler,),
+                   {'config': config or MockTwitterConfig(), 'channels': {}})
+    server = ThreadingHTTPServer((host, port), handler)
+    # Failure injection draws from its own seeded generator, so a run replays the same failures
+    server.rng = random.Random(handler.config.seed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve a local stand-in for x.com')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--thread-size', type=int, default=200)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--show-more-every', type=int, default=0)
+    parser.add_argument('--spam-replies', type=int, default=0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    config = MockTwitterConfig(args.thread_size, args.page_size, args.latency, args.show_more_every,
+                               args.spam_replies, args.failure_rate, args.seed)
+    server, base_url = start_mock_server(config, port=args.port)
+    print(f"Mock X/Twitter serving at {base_url} (e.g. {base_url}/the_hindu/status/1135442056816414722)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,181 @@
+import argparse
+import json
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from comment_cleaning import normalize_column
+from processed_files import iter_conversations
+
+CLUSTERS_FILE = 'near_duplicate_clusters.jsonl'
+
+# Near-duplicate detection: MinHash over character shingles of the normalized text,
+# banded for LSH. 16 bands of 4 rows make pairs above ~0.5 Jaccard likely
+# candidates; candidates are kept if their signatures agree on at least
+# NEAR_DUPLICATE_THRESHOLD of the permutations.
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+NEAR_DUPLICATE_THRESHOLD = 0.7
+MINHASH_SEED = 1
+
+# Shingles hashed per numpy pass when computing signatures (bounds peak memory)
+SIGNATURE_CHUNK = 1 << 16
+
+# Comments whose signatures are computed per batch while streaming processed_json/
+BATCH_SIZE = 20000
+
+def shingle_hashes(text, size=SHINGLE_SIZE):
+    """crc32 of every `size`-character shingle of an already normalized text"""
+    text = text.lower()
+    if len(text) <= size:
+        return {zlib.crc32(text.encode('utf-8'))}
+    return {zlib.crc32(text[i:i + size].encode('utf-8')) for i in range(len(text) - size + 1)}
+
+def minhash_permutations(num_perm=NUM_PERMUTATIONS, seed=MINHASH_SEED):
+    """Multiply-shift hash parameters; fixed by the seed so signatures match across processes and runs"""
+    rng = np.random.default_rng(seed)
+    multipliers = rng.integers(1, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    offsets = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+    return multipliers[:, None], offsets[:, None]
+
+def minhash_signatures(texts, num_perm=NUM_PERMUTATIONS, seed=MINHASH_SEED):
+    """MinHash signatures (one uint32 row per text) of a column of texts, normalized as for dedupe"""
+    multipliers, offsets = minhash_permutations(num_perm, seed)
+    shingles = [np.fromiter(shingle_hashes(text), dtype=np.uint64) for text in normalize_column(texts)]
+    signatures = np.empty((len(shingles), num_perm), dtype=np.uint32)
+    start = 0
+    while start < len(shingles):
+        # Take texts until the chunk holds SIGNATURE_CHUNK shingles (at least one text)
+        end, total = start, 0
+        while end < len(shingles) and (end == start or total + len(shingles[end]) <= SIGNATURE_CHUNK):
+            total += len(shingles[end])
+            end += 1
+        values = np.concatenate(shingles[start:end])
+        boundaries = np.cumsum([0] + [len(hashes) for hashes in shingles[start:end - 1]])
+        # uint64 arithmetic wraps, so this is (a * x + b) mod 2^64; the top 32 bits are the hash
+        hashed = ((values[None, :] * multipliers + offsets) >> np.uint64(32)).astype(np.uint32)
+        signatures[start:end] = np.minimum.reduceat(hashed, boundaries, axis=1).T
+        start = end
+    return signatures
+
+def near_duplicate_clusters(signatures, bands=LSH_BANDS, threshold=NEAR_DUPLICATE_THRESHOLD):
+    """Cluster near-identical rows with LSH banding; returns each row's cluster label.
+
+    The label is the index of the cluster's first row, so a row whose label is
+    its own index is either a singleton or the first member of its cluster.
+    Candidates come only from rows sharing a band bucket, never from all pairs.
+    """
+    count, num_perm = signatures.shape
+    rows = num_perm // bands
+    mixers = np.random.default_rng(MINHASH_SEED).integers(1, 1 << 63, size=rows, dtype=np.uint64)
+    candidates = []
+    for band in range(bands):
+        keys = (signatures[:, band * rows:(band + 1) * rows].astype(np.uint64) * mixers).sum(axis=1)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        # Pair each bucket member with the bucket's first (lowest-index) member
+        first = order[np.repeat(starts, np.diff(np.r_[starts, count]))]
+        linked = first != order
+        candidates.append(np.stack([first[linked], order[linked]], axis=1))
+    labels = np.arange(count)
+    if not count:
+        return labels
+    # Collapse pairs found in several bands (encoded as one int64 so unique stays 1-D)
+    codes = np.unique(np.concatenate([pair[:, 0] * count + pair[:, 1] for pair in candidates]))
+    pairs = np.stack([codes // count, codes % count], axis=1)
+    if len(pairs):
+        agreement = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+        pairs = pairs[agreement >= threshold]
+
+    # Union-find, always keeping the lowest index as the root
+    parent = list(range(count))
+
+    def find(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    for a, b in pairs.tolist():
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+    return np.array([find(index) for index in range(count)])
+
+def corpus_signatures(input_folder='processed_json', batch_size=BATCH_SIZE):
+    """Stream every processed comment; returns (signatures, rows)
+
+    Each row is (comment_id, conversation_id, channel, text preview).
+    """
+    rows, texts, signatures = [], [], []
+    for conversation_id, data in iter_conversations(input_folder):
+        channel = data.get('channel_name')
+        for comment in data.get('comments', []):
+            text = comment.get('text') or ''
+            # Only a preview of the text is kept, for the report
+            rows.append((comment.get('comment_id'), conversation_id, channel, text[:80]))
+            texts.append(text)
+            if len(texts) >= batch_size:
+                signatures.append(minhash_signatures(texts))
+                texts = []
+    if texts or not signatures:
+        signatures.append(minhash_signatures(texts))
+    return np.concatenate(signatures), rows
+
+def cluster_corpus(input_folder='processed_json', output_file=CLUSTERS_FILE, top=10):
+    """Cluster near-duplicate comments across the whole corpus and write one line per clustered comment.
+
+    Each line holds comment_id, conversation_id, channel, cluster_id (the
+    comment_id of the cluster's first comment) and cluster_size. Singletons are
+    not written. Returns the cluster sizes keyed by cluster_id.
+    """
+    start = time.perf_counter()
+    signatures, rows = corpus_signatures(input_folder)
+    signed = time.perf_counter()
+    labels = near_duplicate_clusters(signatures)
+    clustered = time.perf_counter()
+
+    sizes = np.bincount(labels, minlength=len(labels))
+    cluster_sizes = {}
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for index in np.flatnonzero(sizes[labels] > 1).tolist():
+            label = int(labels[index])
+            comment_id, conversation_id, channel, _ = rows[index]
+            cluster_id = rows[label][0]
+            cluster_sizes[cluster_id] = int(sizes[label])
+            f.write(json.dumps({
+                'comment_id': comment_id,
+                'conversation_id': conversation_id,
+                'channel': channel,
+                'cluster_id': cluster_id,
+                'cluster_size': int(sizes[label])
+            }, ensure_ascii=False) + '\n')
+
+    print(f"{len(rows)} comments: signatures {signed - start:.1f}s, clustering {clustered - signed:.1f}s")
+    print(f"{len(cluster_sizes)} near-duplicate clusters covering {sum(cluster_sizes.values())} comments "
+          f"written to {output_file}")
+    histogram = Counter(cluster_sizes.values())
+    print("Cluster sizes: " + ', '.join(f"{size}: {count}" for size, count in sorted(histogram.items())))
+
+    # Largest clusters, with how far they spread across conversations and channels
+    members = {}
+    for index in np.flatnonzero(sizes[labels] > 1).tolist():
+        members.setdefault(int(labels[index]), []).append(index)
+    for label, indices in sorted(members.items(), key=lambda item: -len(item[1]))[:top]:
+        conversations = {rows[index][1] for index in indices}
+        channels = {rows[index][2] for index in indices}
+        print(f"  {len(indices):>5} comments, {len(conversations)} conversations, {len(channels)} channels: "
+              f"{rows[label][3]!r}")
+    return cluster_sizes
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Corpus-wide near-duplicate clustering of processed comments')
+    parser.add_argument('--input', default='processed_json')
+    parser.add_argument('--output', default=CLUSTERS_FILE)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+    cluster_corpus(args.input, args.output, args.top)
@@ -0,0 +1,126 @@
+from datetime import datetime, timezone
+import json
+import sys
+import time
+
+# GraphQL operations whose responses carry the reply timeline of a status page
+REPLY_TIMELINE_OPERATIONS = ('/TweetDetail', '/ConversationTimeline')
+
+def enable_performance_logging(options):
+    """Turn on Chrome's performance log so network responses can be read back"""
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return options
+
+def twitter_time_to_iso(created_at):
+    """Convert 'Mon Jun 03 07:07:54 +0000 2019' to the DOM's '2019-06-03T07:07:54.000Z' format"""
+    if not created_at:
+        return None
+    try:
+        parsed = datetime.strptime(created_at, '%a %b %d %H:%M:%S %z %Y')
+    except ValueError:
+        return None
+    return parsed.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+def unwrap_tweet(result):
+    """Return the tweet object inside a tweet_results.result (handles visibility wrappers)"""
+    if not result:
+        return None
+    if result.get('__typename') == 'TweetWithVisibilityResults':
+        result = result.get('tweet')
+    if not result or 'legacy' not in result:
+        return None
+    return result
+
+def tweet_to_comment(tweet, scrape_time):
+    """Map one GraphQL tweet object onto the scraper's comment record layout"""
+    legacy = tweet['legacy']
+    user = tweet.get('core', {}).get('user_results', {}).get('result', {})
+    # Newer payloads move name/screen_name from user.legacy to user.core
+    user_core = user.get('core') or user.get('legacy') or {}
+    note = tweet.get('note_tweet', {}).get('note_tweet_results', {}).get('result', {})
+    return {
+        'text': note.get('text') or legacy.get('full_text'),
+        'user_name': user_core.get('name'),
+        'user_handle': '@' + user_core['screen_name'] if user_core.get('screen_name') else None,
+        'comment_time': twitter_time_to_iso(legacy.get('created_at')),
+        'scrape_time': scrape_time,
+        'status_id': tweet.get('rest_id') or legacy.get('id_str'),
+        'like_count': legacy.get('favorite_count'),
+        'reply_count': legacy.get('reply_count'),
+        'retweet_count': legacy.get('retweet_count')
+    }
+
+def iter_timeline_items(instructions):
+    """Yield every tweet_results.result found in a list of timeline instructions"""
+    for instruction in instructions:
+        entries = instruction.get('entries', [])
+        if instruction.get('type') == 'TimelineAddToModule':
+            entries = [{'content': {'items': instruction.get('moduleItems', [])}}]
+        for entry in entries:
+            content = entry.get('content', {})
+            item_contents = [content.get('itemContent', {})]
+            item_contents += [item.get('item', {}).get('itemContent', {}) for item in content.get('items', [])]
+            for item_content in item_contents:
+                result = item_content.get('tweet_results', {}).get('result')
+                if result:
+                    yield result
+
+def parse_reply_timeline(payload, conversation_id=None, scrape_time=None):
+    """Parse a TweetDetail-style response body into comment dicts, in timeline order.
+
+    With `conversation_id`, tweets from other conversations (e.g. late responses
+    from the previous status page) are skipped.
+    """
+    if isinstance(payload, (str, bytes)):
+        payload = json.loads(payload)
+    scrape_time = scrape_time or time.strftime('%Y-%m-%d %H:%M:%S')
+    data = payload.get('data', {})
+    conversation = data.get('threaded_conversation_with_injections_v2') or data.get('threaded_conversation_with_injections') or {}
+    comments = []
+    for result in iter_timeline_items(conversation.get('instructions', [])):
+        tweet = unwrap_tweet(result)
+        if tweet is None:
+            continue
+        tweet_conversation = tweet['legacy'].get('conversation_id_str')
+        if conversation_id is None or tweet_conversation in (None, str(conversation_id)):
+            comments.append(tweet_to_comment(tweet, scrape_time))
+    return comments
+
+def iter_reply_timeline_request_ids(log_entries):
+    """Yield request IDs of reply-timeline responses from raw performance log entries"""
+    for entry in log_entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, TypeError, json.JSONDecodeError):
+            continue
+        if message.get('method') != 'Network.responseReceived':
+            continue
+        params = message.get('params', {})
+        url = params.get('response', {}).get('url', '')
+        if '/graphql/' in url and any(op in url for op in REPLY_TIMELINE_OPERATIONS):
+            yield params['requestId']
+
+def capture_network_comments(driver, conversation_id=None):
+    """Drain the performance log and parse every reply-timeline response fetched since the last call"""
+    comments = []
+    for request_id in iter_reply_timeline_request_ids(driver.get_log('performance')):
+        try:
+            body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception as e:
+            # Bodies of old requests may already have been evicted by Chrome
+            print(f"Could not read response body for request {request_id}: {str(e)}")
+            continue
+        try:
+            comments.extend(parse_reply_timeline(body.get('body', ''), conversation_id))
+        except (ValueError, AttributeError) as e:
+            print(f"Could not parse reply timeline response {request_id}: {str(e)}")
+    return comments
+
+if __name__ == "__main__":
+    # Parse recorded responses offline: python network_capture.py fixtures/tweet_detail_response.json
+    for path in sys.argv[1:]:
+        with open(path, 'r', encoding='utf-8') as f:
+            parsed = parse_reply_timeline(json.load(f))
+        print(f"{path}: {len(parsed)} tweets")
+        for comment in parsed:
+            print(json.dumps(comment, ensure_ascii=False))
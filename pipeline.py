@@ -0,0 +1,210 @@
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import twitter_scraper_new as scraper
+from job_state import EMPTY, SUCCEEDED, RetryScheduler
+from process_comments_new import (MANIFEST_FILE, PROCESSING_VERSION, clean_file, file_sha256, load_manifest,
+                                  save_manifest, write_conversation)
+from scraper_pool import BrowserSession, write_processed_urls
+
+# Finished conversations buffered between two stages; a full queue makes the stage before it wait
+QUEUE_SIZE = 8
+
+class ScrapePipeline:
+    """Scrape -> clean/dedupe -> write processed_json/, as asyncio stages joined by bounded queues.
+
+    Browser sessions run in a thread pool, cleaning in a process pool and file
+    writes in a single disk thread, so one conversation is cleaned and written
+    while the next is being scraped. The scheduler, job store and manifest are
+    only touched from the event loop, which keeps them single-writer.
+    """
+
+    def __init__(self, scheduler, driver_factory, login, scrape_url, num_workers=1, clean_workers=2,
+                 output_folder='processed_json', queue_size=QUEUE_SIZE, min_interval=10, max_retry_wait=900,
+                 max_driver_restarts=3, metrics=None, manifest_file=MANIFEST_FILE):
+        self.scheduler = scheduler
+        self.driver_factory = driver_factory
+        self.login = login
+        self.scrape_url = scrape_url
+        self.num_workers = num_workers
+        self.clean_workers = clean_workers
+        self.output_folder = output_folder
+        self.queue_size = queue_size
+        self.min_interval = min_interval
+        self.max_retry_wait = max_retry_wait
+        self.max_driver_restarts = max_driver_restarts
+        self.metrics = metrics
+        self.manifest_file = manifest_file
+        self.manifest = None
+        # Comments written per URL during this run
+        self.written = {}
+
+    async def next_url(self):
+        """Claim the next due URL, sleeping for retries due within max_retry_wait; None when nothing is left"""
+        while True:
+            url = self.scheduler.next_url()
+            if url is not None:
+                # Marked running before any await, so no other worker can pick it up
+                self.scheduler.started(url)
+                return url
+            wait = self.scheduler.next_wait()
+            if wait is None or wait > self.max_retry_wait:
+                return None
+            await asyncio.sleep(max(wait, 1))
+
+    async def scrape_worker(self, worker_id):
+        loop = asyncio.get_running_loop()
+        session = BrowserSession(worker_id, self.driver_factory, self.login, self.min_interval,
+                                 self.max_driver_restarts)
+        try:
+            driver = await loop.run_in_executor(self.browsers, session.start)
+            while driver is not None:
+                url = await self.next_url()
+                if url is None:
+                    break
+
+                await asyncio.sleep(session.next_load_delay())
+                try:
+                    reply_count = await loop.run_in_executor(self.browsers, self.scrape_url, driver, url)
+                except Exception as e:
+                    print(f"[worker {worker_id}] Error processing URL {url}: {str(e)}")
+                    self.scheduler.record(url, error=str(e))
+                    driver = await loop.run_in_executor(self.browsers, session.recover)
+                    continue
+
+                status = self.scheduler.record(url, reply_count)
+                print(f"[worker {worker_id}] Scraped {url}, found {reply_count} replies ({status})")
+                # Waits here while cleaning is behind, instead of piling up finished conversations
+                await self.scraped.put((url, reply_count, time.monotonic()))
+        finally:
+            await loop.run_in_executor(self.browsers, session.close)
+            print(f"[worker {worker_id}] Stopped")
+
+    async def clean_worker(self):
+        """Dedupe, filter and reshape scraped conversations in the process pool"""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self.scraped.get()
+            if item is None:
+                break
+            url, reply_count, scraped_at = item
+            input_path = scraper.get_output_filename(url)
+            try:
+                conversation_id, output_data = await loop.run_in_executor(self.cleaners, clean_file, input_path)
+            except Exception as e:
+                print(f"Could not clean {input_path}: {str(e)}")
+                continue
+            await self.cleaned.put((url, reply_count, scraped_at, input_path, conversation_id, output_data))
+
+    def write_output(self, input_path, conversation_id, output_data):
+        """Write one processed conversation and return its manifest entry"""
+        write_conversation(self.output_folder, conversation_id, output_data)
+        stat = os.stat(input_path)
+        return {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_sha256(input_path),
+            'conversation_id': conversation_id,
+            'outputs': [os.path.join(self.output_folder, f'{conversation_id}.json')]
+        }
+
+    async def writer(self):
+        """Sole writer of processed_json/ and the manifest"""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self.cleaned.get()
+            if item is None:
+                break
+            url, reply_count, scraped_at, input_path, conversation_id, output_data = item
+            try:
+                entry = await loop.run_in_executor(self.disk, self.write_output, input_path, conversation_id,
+                                                   output_data)
+            except OSError as e:
+                print(f"Could not write {conversation_id}: {str(e)}")
+                continue
+            # Recorded so a later process_comments_new.py run only rebuilds the combined file. The
+            # conversation's old chunk is dropped so that run re-reads it from processed_json/
+            self.manifest.setdefault('files', {})[os.path.basename(input_path)] = entry
+            for combined in self.manifest.get('combined', {}).values():
+                combined.get('chunks', {}).pop(conversation_id, None)
+            total_comments = output_data['total_comments']
+            self.written[url] = total_comments
+
+            # Replies that were all filtered out leave the conversation empty, as data_cleaning.py would
+            # report it; scheduled for a retry with the usual backoff
+            if total_comments == 0 and reply_count:
+                print(f"No replies left in {url} after cleaning ({self.scheduler.record(url, 0)})")
+
+            latency = time.monotonic() - scraped_at
+            print(f"Wrote {conversation_id} ({total_comments} comments) {latency:.1f}s after its scrape finished")
+            if self.metrics is not None:
+                self.metrics.write([{
+                    'time': time.time(),
+                    'event': 'processed',
+                    'url': url,
+                    'conversation_id': conversation_id,
+                    'comments': total_comments,
+                    'seconds_after_scrape': round(latency, 3)
+                }])
+
+    async def run(self):
+        """Run every stage until no URL is left to scrape; returns comments written per URL"""
+        self.scraped = asyncio.Queue(self.queue_size)
+        self.cleaned = asyncio.Queue(self.queue_size)
+        os.makedirs(self.output_folder, exist_ok=True)
+        self.manifest = load_manifest(self.manifest_file)
+        if self.manifest.get('version') != PROCESSING_VERSION:
+            self.manifest = {'version': PROCESSING_VERSION}
+
+        with ThreadPoolExecutor(self.num_workers, thread_name_prefix='pipeline-browser') as self.browsers, \
+                ProcessPoolExecutor(self.clean_workers) as self.cleaners, \
+                ThreadPoolExecutor(1, thread_name_prefix='pipeline-disk') as self.disk:
+            cleaners = [asyncio.create_task(self.clean_worker()) for _ in range(self.clean_workers)]
+            writer = asyncio.create_task(self.writer())
+            try:
+                await asyncio.gather(*(self.scrape_worker(i) for i in range(self.num_workers)))
+            finally:
+                # Drain what was already scraped before stopping the later stages
+                for _ in cleaners:
+                    await self.scraped.put(None)
+                await asyncio.gather(*cleaners)
+                await self.cleaned.put(None)
+                await writer
+                save_manifest(self.manifest_file, self.manifest)
+        print(f"Pipeline finished: {len(self.written)} conversations written to {self.output_folder}/")
+        return self.written
+
+def main(num_workers=scraper.NUM_WORKERS, clean_workers=2, base_url=scraper.BASE_URL, url_delay=10,
+         max_retry_wait=900, output_folder='processed_json', queue_size=QUEUE_SIZE):
+    processed_urls_file = 'processed_urls.json'
+    job_store = scraper.load_jobs(processed_urls_file, base_url)
+    scheduler = RetryScheduler(job_store)
+    metrics = scraper.open_metrics()
+    scrape = lambda driver, url: scraper.scrape_url(driver, url, metrics=metrics)
+    pipeline = ScrapePipeline(scheduler, scraper.create_driver, scraper.session_login(metrics, base_url), scrape,
+                              num_workers=num_workers, clean_workers=clean_workers, output_folder=output_folder,
+                              queue_size=queue_size, min_interval=url_delay, max_retry_wait=max_retry_wait,
+                              metrics=metrics)
+    try:
+        asyncio.run(pipeline.run())
+    finally:
+        write_processed_urls(processed_urls_file, job_store.urls_with_status(SUCCEEDED, EMPTY))
+        print(f"Job states: {job_store.counts()}")
+        job_store.close()
+        metrics.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Scrape, clean and write processed_json/ in one overlapping run')
+    parser.add_argument('--workers', type=int, default=scraper.NUM_WORKERS, help='browser sessions')
+    parser.add_argument('--clean-workers', type=int, default=2, help='cleaning processes')
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE)
+    parser.add_argument('--output', default='processed_json')
+    parser.add_argument('--url-delay', type=float, default=10)
+    parser.add_argument('--max-retry-wait', type=float, default=900)
+    parser.add_argument('--base-url', default=scraper.BASE_URL)
+    args = parser.parse_args()
+    main(args.workers, args.clean_workers, args.base_url, args.url_delay, args.max_retry_wait, args.output,
+         args.queue_size)
@@ -1,90 +1,267 @@
 import os
 import json
-import regex
-from collections import defaultdict
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from comment_cleaning import VALID_COMMENT_PATTERN, clean_comment_texts
+from near_duplicates import minhash_signatures, near_duplicate_clusters
+from processed_files import COMBINED_BASENAME
+
+# Records each new_data/ input's size, mtime and hash plus the outputs it produced
+MANIFEST_FILE = 'processed_manifest.json'
+
+# Bump when the processing rules change so incremental runs redo every conversation
+PROCESSING_VERSION = 3
 
 def is_valid_comment(text):
     # Returns True if text contains at least one letter or number in any language
-    return bool(regex.search(r'\p{L}|\p{N}', text))
+    return bool(VALID_COMMENT_PATTERN.search(text))
+
+def process_conversation(data):
+    """Dedupe, filter and reshape one scraped conversation; returns (conversation_id, output_data)"""
+    channel_name = data.get('channel_name', '')
+    conversation_id = data.get('conversation_id', '')
+    url = data.get('url', '')
+    scrape_start_time = data.get('scrape_start_time', '')
+    post = data['comments'].get('post', {})
+    comments = data['comments'].get('comments', [])
+
+    # Remove duplicates (after NFC, zero-width and whitespace normalization) and
+    # comments with no characters or numbers, in one pass over the text column
+    keep = clean_comment_texts([c.get('text') or '' for c in comments])
+    valid_comments = []
+    for index in keep:
+        c = comments[index]
+        # Remove user_handle from each comment
+        c.pop('user_handle', None)
+        valid_comments.append(c)
+
+    # Remove user_handle from post
+    post.pop('user_handle', None)
+
+    # Build output in requested format
+    post_id = conversation_id
+    post_obj = {
+        'post_id': post_id,
+        'text': post.get('text', ''),
+        'user_name': post.get('user_name', ''),
+        'post_time': post.get('post_time', '')
+    }
+    comments_list = []
+    for idx, c in enumerate(valid_comments, 1):
+        comments_list.append({
+            'comment_id': f'{conversation_id}_{idx}',
+            'text': c.get('text', ''),
+            'user_name': c.get('user_name', ''),
+            'comment_time': c.get('comment_time', '')
+        })
+    # Remove the first comment if present
+    if comments_list:
+        comments_list = comments_list[1:]
+
+    # Tag near-duplicates (copy-paste campaigns, bot variants) with the comment_id of
+    # the first reply in their cluster; they are kept, not dropped
+    if comments_list:
+        labels = near_duplicate_clusters(minhash_signatures([c['text'] or '' for c in comments_list]))
+        sizes = np.bincount(labels, minlength=len(labels))
+        for c, label in zip(comments_list, labels.tolist()):
+            c['near_duplicate_cluster'] = comments_list[label]['comment_id'] if sizes[label] > 1 else None
+    output_data = {
+        'channel_name': channel_name,
+        'conversation_id': conversation_id,
+        'url': url,
+        'total_comments': len(comments_list),  # updated count after removing first comment
+        'post': post_obj,
+        'comments': comments_list
+    }
+    return conversation_id, output_data
+
+def clean_file(input_path):
+    """Load one new_data/ file and process it; returns (conversation_id, output_data)"""
+    with open(input_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return process_conversation(data)
+
+def write_conversation(output_folder, conversation_id, output_data):
+    """Write processed_json/<id>.json, replacing any earlier version atomically; returns the document text"""
+    document = json.dumps({conversation_id: output_data}, ensure_ascii=False, indent=2)
+    output_path = os.path.join(output_folder, f'{conversation_id}.json')
+    with open(output_path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(document)
+    os.replace(output_path + '.tmp', output_path)
+    return document
+
+def process_file(input_path, output_folder, combined_format='json'):
+    """Process one new_data/ file, write processed_json/<id>.json, and return its combined-output chunk"""
+    conversation_id, output_data = clean_file(input_path)
+
+    # Save processed file for each conversation_id
+    document = write_conversation(output_folder, conversation_id, output_data)
 
-def process_json_files():
-    input_folder = 'new_data'
-    output_folder = 'processed_json'
-    all_data_file = os.path.join(output_folder, 'all_processed_data_by_conversation.json')
+    if combined_format == 'jsonl':
+        chunk = json.dumps({conversation_id: output_data}, ensure_ascii=False)
+    else:
+        # The member text inside the single-key document is exactly what json.dump
+        # of the whole combined dict writes for this conversation
+        chunk = document[2:-2]
+    return conversation_id, chunk
+
+def file_sha256(path):
+    """Content hash of an input file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_manifest(manifest_file):
+    """Load the new_data -> processed_json manifest (empty if there is none yet)"""
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_manifest(manifest_file, manifest):
+    tmp_file = manifest_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_file, manifest_file)
+
+def input_unchanged(entry, input_path):
+    """True if an input still matches its manifest entry (size+mtime, else content hash) and its outputs exist"""
+    if not entry or not all(os.path.exists(path) for path in entry.get('outputs', [])):
+        return False
+    stat = os.stat(input_path)
+    if stat.st_size != entry['size']:
+        return False
+    if stat.st_mtime_ns != entry['mtime_ns']:
+        # Touched but possibly identical (e.g. re-copied); only the hash can tell
+        if file_sha256(input_path) != entry['sha256']:
+            return False
+        entry['mtime_ns'] = stat.st_mtime_ns
+    return True
+
+def cached_chunk(conversation_id, old_combined, old_chunks, output_folder, combined_format):
+    """Combined-output chunk of an unchanged conversation, copied rather than reprocessed"""
+    if old_combined is not None and conversation_id in old_chunks:
+        offset, length = old_chunks[conversation_id]
+        old_combined.seek(offset)
+        return conversation_id, old_combined.read(length).decode('utf-8')
+    # Fall back to the conversation's own processed_json file
+    with open(os.path.join(output_folder, f'{conversation_id}.json'), 'r', encoding='utf-8') as f:
+        document = f.read()
+    if combined_format == 'jsonl':
+        return conversation_id, json.dumps(json.loads(document), ensure_ascii=False)
+    return conversation_id, document[2:-2]
+
+def write_combined(all_data_file, chunks, combined_format='json'):
+    """Stream per-conversation chunks into the combined file; returns each chunk's (offset, length)"""
+    tmp_file = all_data_file + '.tmp'
+    offsets = {}
+    with open(tmp_file, 'wb') as f:
+        if combined_format == 'json':
+            f.write(b'{')
+        for conversation_id, chunk in chunks:
+            if conversation_id in offsets:
+                print(f"Skipping duplicate conversation {conversation_id} in combined output")
+                continue
+            if combined_format == 'json':
+                f.write(b'\n' if not offsets else b',\n')
+            data = chunk.encode('utf-8')
+            offsets[conversation_id] = [f.tell(), len(data)]
+            f.write(data)
+            if combined_format == 'jsonl':
+                f.write(b'\n')
+        if combined_format == 'json':
+            f.write(b'\n}' if offsets else b'}')
+    os.replace(tmp_file, all_data_file)
+    return offsets
+
+def process_json_files(workers=None, combined_format='json', input_folder='new_data', output_folder='processed_json',
+                       incremental=True, manifest_file=MANIFEST_FILE):
+    """Process new_data/ files over a process pool, streaming results straight to disk.
+
+    combined_format='json' writes all_processed_data_by_conversation.json exactly as a
+    single json.dump of every conversation would; 'jsonl' writes one conversation per line.
+    workers=1 processes files in this process. With incremental=True, inputs whose size,
+    mtime or content hash match the manifest are skipped and their part of the combined
+    file is copied over from the previous run.
+    """
+    extension = '.jsonl' if combined_format == 'jsonl' else '.json'
+    all_data_file = os.path.join(output_folder, COMBINED_BASENAME + extension)
     os.makedirs(output_folder, exist_ok=True)
 
-    all_data = {}
+    manifest = load_manifest(manifest_file) if incremental else {}
+    if manifest.get('version') != PROCESSING_VERSION:
+        manifest = {'version': PROCESSING_VERSION}
+    old_files = manifest.get('files', {})
+    old_combined_info = manifest.get('combined', {}).get(all_data_file, {})
+    old_chunks = {}
+    if os.path.exists(all_data_file):
+        stat = os.stat(all_data_file)
+        if (stat.st_size, stat.st_mtime_ns) == (old_combined_info.get('size'), old_combined_info.get('mtime_ns')):
+            old_chunks = old_combined_info.get('chunks', {})
 
+    # Decide per input whether it must be reprocessed
+    files = {}
+    plan = []
     for filename in os.listdir(input_folder):
-        if filename.endswith('.json'):
-            input_path = os.path.join(input_folder, filename)
-            with open(input_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            channel_name = data.get('channel_name', '')
-            conversation_id = data.get('conversation_id', '')
-            url = data.get('url', '')
-            scrape_start_time = data.get('scrape_start_time', '')
-            post = data['comments'].get('post', {})
-            comments = data['comments'].get('comments', [])
-
-            # Remove duplicate comments using a set
-            comment_set = set()
-            unique_comments = []
-            for c in comments:
-                key = c.get('text', '').strip()
-                if key not in comment_set:
-                    comment_set.add(key)
-                    unique_comments.append(c)
-
-            # Remove comments with no characters or numbers
-            valid_comments = []
-            for c in unique_comments:
-                if is_valid_comment(c.get('text', '')):
-                    # Remove user_handle from each comment
-                    c.pop('user_handle', None)
-                    valid_comments.append(c)
-
-            # Remove user_handle from post
-            post.pop('user_handle', None)
-
-            # Build output in requested format
-            post_id = conversation_id
-            post_obj = {
-                'post_id': post_id,
-                'text': post.get('text', ''),
-                'user_name': post.get('user_name', ''),
-                'post_time': post.get('post_time', '')
-            }
-            comments_list = []
-            for idx, c in enumerate(valid_comments, 1):
-                comments_list.append({
-                    'comment_id': f'{conversation_id}_{idx}',
-                    'text': c.get('text', ''),
-                    'user_name': c.get('user_name', ''),
-                    'comment_time': c.get('comment_time', '')
-                })
-            # Remove the first comment if present
-            if comments_list:
-                comments_list = comments_list[1:]
-            output_data = {
-                'channel_name': channel_name,
-                'conversation_id': conversation_id,
-                'url': url,
-                'total_comments': len(comments_list),  # updated count after removing first comment
-                'post': post_obj,
-                'comments': comments_list
-            }
-            # Save processed file for each conversation_id
-            output_path = os.path.join(output_folder, f'{conversation_id}.json')
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump({conversation_id: output_data}, f, ensure_ascii=False, indent=2)
-            # Add to all_data
-            all_data[conversation_id] = output_data
-
-    # Save all processed data in one file, separated by conversation_id
-    with open(all_data_file, 'w', encoding='utf-8') as f:
-        json.dump(all_data, f, ensure_ascii=False, indent=2)
+        if not filename.endswith('.json'):
+            continue
+        input_path = os.path.join(input_folder, filename)
+        entry = old_files.get(filename)
+        if incremental and input_unchanged(entry, input_path):
+            files[filename] = entry
+            plan.append((filename, entry['conversation_id']))
+        else:
+            stat = os.stat(input_path)
+            files[filename] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': file_sha256(input_path)}
+            plan.append((filename, None))
+    changed = [filename for filename, conversation_id in plan if conversation_id is None]
+    print(f"{len(changed)} of {len(plan)} conversations need processing")
+
+    conversation_ids = [conversation_id for _, conversation_id in plan]
+    if not changed and old_chunks and list(old_chunks) == conversation_ids:
+        print(f"Nothing changed; {all_data_file} is up to date")
+        manifest['files'] = files
+        save_manifest(manifest_file, manifest)
+        return
+
+    def chunks(results):
+        old_combined = open(all_data_file, 'rb') if old_chunks else None
+        try:
+            for filename, conversation_id in plan:
+                if conversation_id is None:
+                    conversation_id, chunk = results(filename)
+                    files[filename]['conversation_id'] = conversation_id
+                    files[filename]['outputs'] = [os.path.join(output_folder, f'{conversation_id}.json')]
+                    yield conversation_id, chunk
+                else:
+                    yield cached_chunk(conversation_id, old_combined, old_chunks, output_folder, combined_format)
+        finally:
+            if old_combined is not None:
+                old_combined.close()
+
+    tasks = {filename: (os.path.join(input_folder, filename), output_folder, combined_format) for filename in changed}
+    if workers == 1 or len(changed) <= 1:
+        offsets = write_combined(all_data_file, chunks(lambda filename: process_file(*tasks[filename])), combined_format)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {filename: executor.submit(process_file, *args) for filename, args in tasks.items()}
+            # Chunks are written in input order, so the combined file is deterministic
+            offsets = write_combined(all_data_file, chunks(lambda filename: futures[filename].result()),
+                                     combined_format)
+
+    stat = os.stat(all_data_file)
+    manifest['files'] = files
+    manifest.setdefault('combined', {})[all_data_file] = {
+        'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'chunks': offsets
+    }
+    save_manifest(manifest_file, manifest)
+    print(f"Processed {len(changed)} changed conversations; {all_data_file} holds {len(offsets)}")
 
 if __name__ == "__main__":
     process_json_files()
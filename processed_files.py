@@ -0,0 +1,15 @@
+import json
+import os
+
+# Combined output file name (without extension) inside the output folder
+COMBINED_BASENAME = 'all_processed_data_by_conversation'
+
+def iter_conversations(input_folder):
+    """Yield (conversation_id, data) from each processed_json/<id>.json, one file in memory at a time"""
+    for filename in sorted(os.listdir(input_folder)):
+        if not filename.endswith('.json') or filename.startswith(COMBINED_BASENAME):
+            continue
+        with open(os.path.join(input_folder, filename), 'r', encoding='utf-8') as f:
+            document = json.load(f)
+        for conversation_id, data in document.items():
+            yield conversation_id, data
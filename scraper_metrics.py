@@ -0,0 +1,220 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collections import Counter, defaultdict
+import argparse
+import glob
+import json
+import threading
+import time
+
+METRICS_FILE = 'scraper_metrics.jsonl'
+
+def count_driver_calls(driver):
+    """Wrap driver.execute so every WebDriver command (including element calls) is counted"""
+    counter = {'calls': 0}
+    original_execute = driver.execute
+
+    def counting_execute(driver_command, params=None):
+        counter['calls'] += 1
+        return original_execute(driver_command, params)
+
+    driver.execute = counting_execute
+    return counter
+
+def driver_call_counter(driver):
+    """The driver's call counter, installed on first use"""
+    counter = getattr(driver, 'scraper_call_counter', None)
+    if counter is None:
+        counter = driver.scraper_call_counter = count_driver_calls(driver)
+    return counter
+
+def process_tree_memory_kb(pid, field='VmHWM'):
+    """Sum of a /proc status field (VmHWM peak or VmRSS current) over a process and its descendants"""
+    children = {}
+    for stat_path in glob.glob('/proc/[0-9]*/stat'):
+        try:
+            with open(stat_path) as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(stat_path.split('/')[2]))
+        except (OSError, IndexError, ValueError):
+            continue
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        stack.extend(children.get(current, []))
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith(field + ':'):
+                        total += int(line.split()[1])
+        except OSError:
+            continue
+    return total
+
+def browser_rss_kb(driver):
+    """Current RSS of the chromedriver/Chrome process tree, or None where /proc is unavailable"""
+    try:
+        return process_tree_memory_kb(driver.service.process.pid, 'VmRSS') or None
+    except Exception:
+        return None
+
+class ScraperMetrics:
+    """Structured per-URL events in a JSONL file, plus running totals in Prometheus text format.
+
+    Scroll attempts and phases are collected on each URL's PageTimings and written
+    here in one go when the URL finishes, so the hot path only appends to lists.
+    Safe to share between pool workers.
+    """
+
+    def __init__(self, path=METRICS_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, 'a', encoding='utf-8')
+        self.urls = Counter()
+        self.phase_seconds = Counter()
+        self.phase_counts = Counter()
+        self.totals = Counter()
+        self.browser_rss_kb = None
+        self.server = None
+
+    def write(self, events):
+        with self.lock:
+            for event in events:
+                self.file.write(json.dumps(event, ensure_ascii=False) + '\n')
+            self.file.flush()
+
+    def record_login(self, seconds, error=None):
+        with self.lock:
+            self.totals['login_seconds'] += seconds
+            self.totals['logins'] += 1
+        self.write([{'time': time.time(), 'event': 'login', 'seconds': round(seconds, 3), 'error': error}])
+
+    def record_url(self, timings, status, error=None, driver_calls=None, browser_rss_kb=None):
+        """Write a URL's scroll/extract events and its summary line, and add it to the totals"""
+        seconds = time.monotonic() - timings.start
+        summary = {
+            'time': time.time(),
+            'event': 'url',
+            'url': timings.url,
+            'status': status,
+            'error': error,
+            'seconds': round(seconds, 3),
+            'phases': {phase: round(value, 3) for phase, value in timings.seconds.items()},
+            'phase_counts': dict(timings.counts),
+            'driver_calls': driver_calls,
+            'browser_rss_kb': browser_rss_kb,
+            **timings.stats
+        }
+        events = [{'event': name, 'url': timings.url, **fields} for name, fields in timings.events]
+        self.write(events + [summary])
+        with self.lock:
+            self.urls[status] += 1
+            self.phase_seconds.update(timings.seconds)
+            self.phase_counts.update(timings.counts)
+            self.totals['url_seconds'] += seconds
+            self.totals['replies_new'] += timings.stats.get('replies new', 0)
+            self.totals['replies_duplicate'] += timings.stats.get('replies duplicate', 0)
+            self.totals['checkpoint_bytes'] += timings.stats.get('checkpoint bytes', 0)
+            self.totals['driver_calls'] += driver_calls or 0
+            if browser_rss_kb is not None:
+                self.browser_rss_kb = browser_rss_kb
+
+    def prometheus_text(self):
+        """Current totals in the Prometheus text exposition format"""
+        with self.lock:
+            lines = ['# TYPE scraper_urls_total counter']
+            lines += [f'scraper_urls_total{{status="{status}"}} {count}' for status, count in self.urls.items()]
+            lines.append('# TYPE scraper_phase_seconds_total counter')
+            lines += [f'scraper_phase_seconds_total{{phase="{phase}"}} {seconds:.3f}'
+                      for phase, seconds in self.phase_seconds.items()]
+            lines.append('# TYPE scraper_phase_calls_total counter')
+            lines += [f'scraper_phase_calls_total{{phase="{phase}"}} {count}'
+                      for phase, count in self.phase_counts.items()]
+            lines.append('# TYPE scraper_replies_total counter')
+            lines.append(f'scraper_replies_total{{kind="new"}} {self.totals["replies_new"]}')
+            lines.append(f'scraper_replies_total{{kind="duplicate"}} {self.totals["replies_duplicate"]}')
+            for name in ('url_seconds', 'driver_calls', 'checkpoint_bytes', 'logins', 'login_seconds'):
+                lines.append(f'# TYPE scraper_{name}_total counter')
+                lines.append(f'scraper_{name}_total {self.totals[name]}')
+            if self.browser_rss_kb is not None:
+                lines.append('# TYPE scraper_browser_rss_bytes gauge')
+                lines.append(f'scraper_browser_rss_bytes {self.browser_rss_kb * 1024}')
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port, host='127.0.0.1'):
+        """Serve /metrics for Prometheus from a background thread on localhost"""
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                body = metrics.prometheus_text().encode('utf-8')
+                self.send_response(200 if self.path == '/metrics' else 404)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"Serving Prometheus metrics on http://{host}:{self.server.server_address[1]}/metrics")
+        return self.server
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+        self.file.close()
+
+def load_events(path=METRICS_FILE):
+    events = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    return events
+
+def report(path=METRICS_FILE, top=10, window=20):
+    """Print the slowest URLs and phases, outcome counts and throughput over the run"""
+    urls = [event for event in load_events(path) if event.get('event') == 'url']
+    if not urls:
+        print(f"No URL events in {path}")
+        return
+    total = sum(event['seconds'] for event in urls)
+    print(f"{len(urls)} URLs in {total / 60:.1f} minutes of scraping: "
+          + ', '.join(f'{status} {count}' for status, count in Counter(e['status'] for e in urls).items()))
+
+    print("\nSlowest URLs:")
+    for event in sorted(urls, key=lambda e: -e['seconds'])[:top]:
+        print(f"  {event['seconds']:7.1f}s  {event.get('replies new', 0):>5} new  {event['status']:<9} {event['url']}")
+
+    phases, calls = defaultdict(float), Counter()
+    for event in urls:
+        for phase, seconds in event.get('phases', {}).items():
+            phases[phase] += seconds
+        calls.update(event.get('phase_counts', {}))
+    print("\nSlowest phases (share of all URL time):")
+    for phase, seconds in sorted(phases.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {phase:<28} {seconds:8.1f}s  {100 * seconds / max(total, 1e-9):5.1f}%  ({calls[phase]}x)")
+
+    # Replies per second over consecutive windows of URLs, to spot degrading throughput
+    print(f"\nThroughput per {window} URLs:")
+    urls.sort(key=lambda e: e['time'])
+    for start in range(0, len(urls), window):
+        chunk = urls[start:start + window]
+        seconds = sum(e['seconds'] for e in chunk)
+        replies = sum(e.get('replies new', 0) for e in chunk)
+        calls = sum(e.get('driver_calls') or 0 for e in chunk)
+        memory = max((e.get('browser_rss_kb') or 0 for e in chunk), default=0)
+        print(f"  URLs {start + 1:>4}-{start + len(chunk):<4} {replies / seconds if seconds else 0:7.1f} replies/s  "
+              f"{calls / len(chunk):7.0f} driver calls/URL  browser {memory / 1024:7.1f} MiB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Summarize scraper_metrics.jsonl')
+    parser.add_argument('--file', default=METRICS_FILE)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--window', type=int, default=20)
+    args = parser.parse_args()
+    report(args.file, args.top, args.window)
@@ -0,0 +1,195 @@
+import json
+import os
+import queue
+import threading
+import time
+
+def write_processed_urls(processed_urls_file, processed_urls):
+    """Atomically rewrite the processed-URL list so a crash never leaves it half written"""
+    tmp_file = processed_urls_file + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(sorted(processed_urls), f)
+    os.replace(tmp_file, processed_urls_file)
+
+def driver_is_alive(driver):
+    """Cheap check that the browser session still answers commands"""
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+def quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+class BrowserSession:
+    """One worker's browser: logged in on start, rate-limited between page loads, restarted when it dies.
+
+    Shared by ScraperPool and pipeline.ScrapePipeline so both handle crashes the
+    same way. All methods block; async callers run them in an executor.
+    """
+
+    def __init__(self, worker_id, driver_factory, login, min_interval=30, max_restarts=3):
+        self.worker_id = worker_id
+        self.driver_factory = driver_factory
+        self.login = login
+        self.min_interval = min_interval
+        self.max_restarts = max_restarts
+        self.driver = None
+        self.restarts = 0
+        self.last_start = 0.0
+
+    def start(self):
+        """Create and log in a driver; leaves `driver` None if the browser cannot start"""
+        driver = None
+        try:
+            driver = self.driver_factory()
+            self.login(driver)
+            print(f"[worker {self.worker_id}] Logged in")
+            self.driver = driver
+        except Exception as e:
+            print(f"[worker {self.worker_id}] Could not start browser session: {str(e)}")
+            if driver is not None:
+                quit_driver(driver)
+            self.driver = None
+        return self.driver
+
+    def next_load_delay(self):
+        """Seconds to wait before the next page load under the per-worker rate limit; claims that slot"""
+        now = time.monotonic()
+        wait = max(self.min_interval - (now - self.last_start), 0)
+        self.last_start = now + wait
+        return wait
+
+    def recover(self):
+        """After a failed scrape: restart the browser if it died; returns the usable driver or None"""
+        # A dead browser only takes this worker down; the failed URL is the caller's to re-queue or record
+        if self.driver is not None and not driver_is_alive(self.driver):
+            quit_driver(self.driver)
+            self.driver = None
+            if self.restarts < self.max_restarts:
+                self.restarts += 1
+                print(f"[worker {self.worker_id}] Browser died, restarting ({self.restarts}/{self.max_restarts})")
+                self.start()
+        return self.driver
+
+    def close(self):
+        if self.driver is not None:
+            quit_driver(self.driver)
+            self.driver = None
+
+class ScraperPool:
+    """N independent browser workers pulling from one URL queue, with a single results writer.
+
+    Each URL gets one attempt per run; failed and empty URLs are retried later
+    through the scheduler's backoff, not by the pool.
+    """
+
+    def __init__(self, driver_factory, login, scrape_url, scheduler, num_workers=2, min_interval=30,
+                 max_driver_restarts=3):
+        self.driver_factory = driver_factory
+        self.login = login
+        self.scrape_url = scrape_url
+        # Job-state scheduler (job_state.RetryScheduler); only the writer thread calls it
+        self.scheduler = scheduler
+        self.num_workers = num_workers
+        self.min_interval = min_interval
+        self.max_driver_restarts = max_driver_restarts
+        self.url_queue = queue.Queue()
+        self.results = queue.Queue()
+        self.pending = 0
+        self.pending_lock = threading.Lock()
+        self.succeeded = {}
+        self.failed = {}
+
+    def remaining(self):
+        with self.pending_lock:
+            return self.pending
+
+    def finish_url(self, url, comment_count=None, error=None):
+        """Hand a final URL outcome to the writer and drop it from the pending count"""
+        self.results.put(('finished', url, comment_count, error))
+        with self.pending_lock:
+            self.pending -= 1
+
+    def worker(self, worker_id):
+        session = BrowserSession(worker_id, self.driver_factory, self.login, self.min_interval,
+                                 self.max_driver_restarts)
+        try:
+            session.start()
+            while session.driver is not None and self.remaining() > 0:
+                try:
+                    url = self.url_queue.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+
+                time.sleep(session.next_load_delay())
+                self.results.put(('started', url, None, None))
+
+                try:
+                    comment_count = self.scrape_url(session.driver, url)
+                except Exception as e:
+                    print(f"[worker {worker_id}] Error processing URL {url}: {str(e)}")
+                    self.finish_url(url, error=str(e))
+                    session.recover()
+                    continue
+                self.finish_url(url, comment_count)
+        finally:
+            session.close()
+            print(f"[worker {worker_id}] Stopped")
+
+    def writer(self):
+        """Sole writer of job state: records starts and outcomes as workers report them"""
+        while True:
+            item = self.results.get()
+            if item is None:
+                break
+            event, url, comment_count, error = item
+            if event == 'started':
+                self.scheduler.started(url)
+                continue
+            status = self.scheduler.record(url, comment_count, error)
+            if error is None:
+                self.succeeded[url] = comment_count
+                print(f"Successfully processed {url}, found {comment_count} comments ({status})")
+            else:
+                self.failed[url] = error
+                print(f"Attempt failed for {url}: {error}")
+
+    def run(self, urls):
+        """Scrape all URLs; returns (succeeded, failed, unprocessed) once every worker stops"""
+        for url in urls:
+            self.url_queue.put(url)
+        self.pending = len(urls)
+
+        writer_thread = threading.Thread(target=self.writer, name='pool-writer')
+        writer_thread.start()
+        workers = [threading.Thread(target=self.worker, args=(i,), name=f'pool-worker-{i}')
+                   for i in range(self.num_workers)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        self.results.put(None)
+        writer_thread.join()
+
+        # Only left over if every worker's browser died before the queue drained
+        unprocessed = []
+        while True:
+            try:
+                unprocessed.append(self.url_queue.get_nowait())
+            except queue.Empty:
+                break
+        if unprocessed:
+            print(f"{len(unprocessed)} URLs left unprocessed because no browser sessions survived")
+        print(f"Pool finished: {len(self.succeeded)} succeeded, {len(self.failed)} failed")
+        return self.succeeded, self.failed, unprocessed
+
+def run_pool(urls, num_workers, driver_factory, login, scrape_url, scheduler, min_interval=30):
+    """Scrape URLs with `num_workers` independent browser sessions"""
+    pool = ScraperPool(driver_factory, login, scrape_url, scheduler, num_workers=num_workers,
+                       min_interval=min_interval)
+    return pool.run(urls)
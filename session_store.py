@@ -0,0 +1,134 @@
+import json
+import os
+import threading
+import time
+
+from adaptive_waits import timed_wait
+
+READ_LOCAL_STORAGE_JS = "return Object.assign({}, window.localStorage);"
+WRITE_LOCAL_STORAGE_JS = """
+var items = arguments[0];
+for (var key in items) {
+    window.localStorage.setItem(key, items[key]);
+}
+"""
+
+class SessionStore:
+    """Saves an authenticated session (cookies + localStorage) once and restores it into new drivers"""
+
+    def __init__(self, path, base_url='https://x.com/', probe_url='https://x.com/home',
+                 max_age=7 * 24 * 3600, probe_timeout=15, clock=time.time):
+        self.path = path
+        self.base_url = base_url
+        self.probe_url = probe_url
+        self.max_age = max_age
+        self.probe_timeout = probe_timeout
+        self.clock = clock
+        # Only one worker at a time may fall back to the interactive login flow
+        self.login_lock = threading.Lock()
+
+    def save(self, driver):
+        """Persist the driver's cookies and localStorage after a successful login"""
+        session = {
+            'saved_at': self.clock(),
+            'cookies': driver.get_cookies(),
+            'local_storage': driver.execute_script(READ_LOCAL_STORAGE_JS) or {}
+        }
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        # Created owner-only, so the auth cookies are never readable by others, even mid-write
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        # A .tmp left by an earlier crash keeps its old mode; O_TRUNC has already emptied it
+        os.fchmod(fd, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(session, f)
+        os.replace(tmp_path, self.path)
+        print(f"Saved session with {len(session['cookies'])} cookies to {self.path}")
+
+    def load(self):
+        """Return the saved session, or None if it is missing, too old or its cookies have expired"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                session = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        now = self.clock()
+        if now - session.get('saved_at', 0) > self.max_age:
+            print("Saved session is older than max_age, ignoring it")
+            return None
+        cookies = [c for c in session.get('cookies', []) if c.get('expiry') is None or c['expiry'] > now]
+        if not cookies:
+            print("All saved session cookies have expired")
+            return None
+        session['cookies'] = cookies
+        return session
+
+    def invalidate(self):
+        """Forget the saved session, e.g. after the probe shows it was logged out"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def restore(self, driver, session):
+        """Load saved cookies and localStorage into a fresh driver"""
+        # Cookies can only be set for the domain currently open in the browser
+        driver.get(self.base_url)
+        driver.delete_all_cookies()
+        for cookie in session['cookies']:
+            cookie = dict(cookie)
+            if cookie.get('sameSite') not in ('Strict', 'Lax', 'None'):
+                cookie.pop('sameSite', None)
+            try:
+                driver.add_cookie(cookie)
+            except Exception as e:
+                print(f"Could not restore cookie {cookie.get('name')}: {str(e)}")
+        if session.get('local_storage'):
+            driver.execute_script(WRITE_LOCAL_STORAGE_JS, session['local_storage'])
+
+    def is_valid(self, driver, timings=None):
+        """Open a cheap logged-in page and check we were not bounced to the login flow"""
+        driver.get(self.probe_url)
+
+        def probe():
+            current_url = driver.current_url
+            if '/login' in current_url or '/i/flow/' in current_url:
+                return 'logged out'
+            # 'css selector' is By.CSS_SELECTOR; kept literal so fake drivers need no selenium
+            if driver.find_elements('css selector', '[data-testid="SideNav_AccountSwitcher_Button"]'):
+                return 'logged in'
+            return None
+
+        result, _ = timed_wait(probe, self.probe_timeout, 'session probe', timings)
+        return result == 'logged in'
+
+    def try_restore(self, driver, session, timings=None):
+        """Restore `session` into `driver`; returns True if it is still logged in"""
+        try:
+            self.restore(driver, session)
+            if self.is_valid(driver, timings):
+                return True
+        except Exception as e:
+            print(f"Restoring saved session failed: {str(e)}")
+        print("Saved session is no longer valid")
+        return False
+
+    def ensure_logged_in(self, driver, login, timings=None):
+        """Reuse the saved session if possible, otherwise run `login(driver)` once and save the result"""
+        session = self.load()
+        if session is not None and self.try_restore(driver, session, timings):
+            print("Restored saved session")
+            return
+        with self.login_lock:
+            # Another worker may have logged in and saved a fresh session while we waited
+            latest = self.load()
+            if (latest is not None and (session is None or latest['saved_at'] != session['saved_at'])
+                    and self.try_restore(driver, latest, timings)):
+                print("Restored session saved by another worker")
+                return
+            self.invalidate()
+            login(driver)
+            self.save(driver)
+            print("Login successful!")
@@ -0,0 +1,53 @@
+import pytest
+
+import adaptive_waits
+from adaptive_waits import PageTimings, wait_for_new_content
+
+class FakeClock:
+    """Stands in for the time module so waits run instantly"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+class FakeDriver:
+    """A page quiet since long before the wait; new replies land `arrive_after` seconds in"""
+
+    def __init__(self, clock, arrive_after):
+        self.clock = clock
+        self.start = clock.now
+        self.arrive_at = clock.now + arrive_after
+        self.last_mutation = clock.now - 10
+
+    def execute_script(self, script, *args):
+        arrived = self.clock.now >= self.arrive_at
+        if arrived:
+            self.last_mutation = max(self.last_mutation, self.arrive_at)
+        return {'replies': 20 if arrived else 10, 'height': 3000 if arrived else 2000, 'spinners': 0,
+                'quiet_ms': (self.clock.now - self.last_mutation) * 1000}
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(adaptive_waits, 'time', clock)
+    return clock
+
+def test_quiet_page_still_waits_for_replies_after_scroll(clock):
+    driver = FakeDriver(clock, arrive_after=1.5)
+    before = driver.execute_script(None)
+    loaded, waited = wait_for_new_content(driver, before, 8, 'scroll', PageTimings('url'))
+    assert loaded
+    assert waited >= 1.5
+    assert driver.execute_script(None)['replies'] == 20
+
+def test_idle_exit_counts_from_the_start_of_the_wait(clock):
+    driver = FakeDriver(clock, arrive_after=60)
+    before = driver.execute_script(None)
+    loaded, waited = wait_for_new_content(driver, before, 8, 'scroll')
+    assert loaded
+    assert 2 <= waited < 8
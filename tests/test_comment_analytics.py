@@ -0,0 +1,36 @@
+from collections import defaultdict
+
+from comment_analytics import CountMinSketch, tokenize
+
+def test_sketch_rows_collide_independently():
+    sketch = CountMinSketch(width=1 << 10, depth=4)
+    by_first_cell = defaultdict(list)
+    for i in range(50000):
+        cells = sketch.cells(f'term{i}')
+        by_first_cell[cells[0]].append(cells)
+    pairs = second_row = every_row = 0
+    for group in by_first_cell.values():
+        for i, cells in enumerate(group):
+            for other in group[i + 1:]:
+                pairs += 1
+                second_row += cells[1] == other[1]
+                every_row += cells == other
+    # Keys sharing a row-0 cell should share a row-1 cell about 1/width of the time, and almost never all cells
+    assert second_row < 2 * pairs / sketch.width
+    assert every_row <= 1
+
+def test_sketch_never_undercounts_and_merges():
+    left, right = CountMinSketch(width=64, depth=4), CountMinSketch(width=64, depth=4)
+    for i in range(500):
+        (left if i % 2 else right).add(f'#tag{i % 50}', i)
+    merged = left.merge(right)
+    for tag in range(50):
+        assert merged.estimate(f'#tag{tag}') >= sum(i for i in range(500) if i % 50 == tag)
+
+def test_links_are_not_tokens():
+    text = ('Watch x.com/ndtv/status/1900000000000000001 and youtu.be/abc123 or https://t.co/xyz '
+            'via www.ndtv.com, ndtv.co.in and x.com… ok.thanks mail me@ndtv.com')
+    hashtags, mentions, words = tokenize(text)
+    assert words == ['watch', 'and', 'or', 'via', 'and', 'ok', 'thanks', 'mail']
+    assert mentions == []
+    assert tokenize('@ndtv_india please check')[1] == ['@ndtv_india']
@@ -0,0 +1,56 @@
+import pytest
+
+import comment_cleaning
+from comment_cleaning import VALID_COMMENT_PATTERN, clean_comment_texts, normalize_column, normalize_text
+
+TEXTS = [
+    'Great point',
+    'Great  point',             # collapses to the first text
+    ' Great point\u200b ',      # so does this, once the zero-width space and edges go
+    'नमस्ते',
+    'न\u200dमस्ते',              # a zero-width joiner inside a Hindi word
+    'e\u0301cole',              # decomposed, NFC-equal to the next text
+    'école',
+    '!!!',                      # no letter or number
+    '',
+    None,
+    '🙏🙏',
+    '42',
+    'Great point',
+    'great point',              # case is kept, so this is a different comment
+]
+
+@pytest.fixture(params=['arrow', 'python'])
+def backend(request, monkeypatch):
+    if request.param == 'arrow':
+        if comment_cleaning.pa is None:
+            pytest.skip('pyarrow is not installed')
+    else:
+        monkeypatch.setattr(comment_cleaning, 'pa', None)
+    return request.param
+
+def reference_clean(texts, seen):
+    keep = []
+    for i, text in enumerate(texts):
+        key = normalize_text(text or '')
+        if VALID_COMMENT_PATTERN.search(key) and key not in seen:
+            seen.add(key)
+            keep.append(i)
+    return keep
+
+def test_matches_per_row_reference(backend):
+    assert clean_comment_texts(TEXTS) == reference_clean(TEXTS, set()) == [0, 3, 5, 11, 13]
+
+def test_seen_dedupes_across_batches(backend):
+    seen = set()
+    assert clean_comment_texts(TEXTS[:7], seen) == [0, 3, 5]
+    assert clean_comment_texts(TEXTS[7:], seen) == [4, 6]
+    assert seen == {'Great point', 'नमस्ते', 'école', '42', 'great point'}
+
+def test_empty_batches(backend):
+    assert clean_comment_texts([]) == []
+    assert clean_comment_texts([None, '', '   ']) == []
+
+def test_normalize_column_matches_normalize_text(backend):
+    texts = TEXTS + ['\ta\n\nb\x00c ', ' x  y ']
+    assert normalize_column(texts) == [normalize_text(text or '') for text in texts]
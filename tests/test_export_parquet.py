@@ -0,0 +1,34 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from export_parquet import export_parquet, read_table
+
+def write_conversation(folder, conversation_id, channel, comment_texts):
+    comments = [{'comment_id': f'{conversation_id}-{i}', 'text': text, 'user_name': 'user',
+                 'comment_time': '2025-03-22T16:02:37.000Z'} for i, text in enumerate(comment_texts)]
+    data = {'channel_name': channel, 'conversation_id': conversation_id,
+            'url': f'https://x.com/{channel}/status/{conversation_id}', 'total_comments': len(comments),
+            'post': {'text': 'post', 'user_name': channel, 'post_time': '2025-03-21T17:02:39.000Z'},
+            'comments': comments}
+    with open(os.path.join(folder, f'{conversation_id}.json'), 'w', encoding='utf-8') as f:
+        json.dump({conversation_id: data}, f)
+
+def test_partitions_without_rows_are_removed(tmp_path):
+    input_folder = tmp_path / 'processed_json'
+    output_folder = str(tmp_path / 'parquet')
+    input_folder.mkdir()
+    write_conversation(input_folder, '1', 'ndtv', ['first', 'second'])
+    write_conversation(input_folder, '2', 'the_hindu', ['third'])
+    assert export_parquet(str(input_folder), output_folder) == {'posts': 2, 'comments': 3}
+
+    # the_hindu's only conversation loses its comments; its old comments partition must not survive
+    write_conversation(input_folder, '2', 'the_hindu', [])
+    assert export_parquet(str(input_folder), output_folder) == {'posts': 2, 'comments': 2}
+    assert not os.path.exists(os.path.join(output_folder, 'comments', 'channel=the_hindu'))
+    comments = read_table('comments', ['comment_id', 'channel'], output_folder=output_folder).to_pydict()
+    assert sorted(comments['comment_id']) == ['1-0', '1-1']
+    assert read_table('posts', output_folder=output_folder).num_rows == 2
@@ -0,0 +1,25 @@
+import urllib.error
+import urllib.request
+
+from mock_twitter_server import MockTwitterConfig, start_mock_server
+
+def failure_pattern(seed, requests=30):
+    server, base_url = start_mock_server(MockTwitterConfig(latency=0, failure_rate=0.5, seed=seed))
+    statuses = []
+    try:
+        for _ in range(requests):
+            try:
+                with urllib.request.urlopen(f'{base_url}/i/api/graphql/x/TweetDetail?focalTweetId=1') as response:
+                    statuses.append(response.status)
+            except urllib.error.HTTPError as e:
+                statuses.append(e.code)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return statuses
+
+def test_failure_injection_replays_for_a_seed():
+    first = failure_pattern(seed=7)
+    assert set(first) == {200, 500}
+    assert failure_pattern(seed=7) == first
+    assert failure_pattern(seed=8) != first
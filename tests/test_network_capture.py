@@ -0,0 +1,73 @@
+import json
+import os
+
+from network_capture import iter_reply_timeline_request_ids, parse_reply_timeline, twitter_time_to_iso
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fixtures',
+                            'tweet_detail_response.json')
+CONVERSATION_ID = '1135442056816414722'
+SCRAPE_TIME = '2026-01-01 00:00:00'
+
+def load_fixture():
+    with open(FIXTURE_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def test_parses_every_tweet_in_timeline_order():
+    comments = parse_reply_timeline(load_fixture(), CONVERSATION_ID, SCRAPE_TIME)
+    assert [c['status_id'] for c in comments] == [
+        '1135442056816414722',  # the focal post comes first, as in the DOM scrape
+        '1135442971234566144',
+        '1135443200012345345',
+        '1135444001122334455',  # wrapped in TweetWithVisibilityResults
+        '1135444555566667777',  # added to a thread by TimelineAddToModule
+        '1135445000000000001',
+    ]
+
+def test_field_values():
+    comments = {c['status_id']: c for c in parse_reply_timeline(load_fixture(), CONVERSATION_ID, SCRAPE_TIME)}
+    assert comments['1135442971234566144'] == {
+        'text': "Bending on knees!!\n@HRDMinistry\nSo a fake Doctor can't hold own degrees",
+        'user_name': 'R K',
+        'user_handle': '@rk_speaks',
+        'comment_time': '2019-06-03T07:07:54.000Z',
+        'scrape_time': SCRAPE_TIME,
+        'status_id': '1135442971234566144',
+        'like_count': 12,
+        'reply_count': 1,
+        'retweet_count': 3,
+    }
+    module_reply = comments['1135444555566667777']
+    assert module_reply['text'] == 'इसलिए कहते हैं मेरा पुराना नाता है'
+    assert module_reply['user_handle'] == '@rahul_in'
+    assert module_reply['comment_time'] == '2019-06-03T07:15:40.000Z'
+    assert comments[CONVERSATION_ID]['user_handle'] == '@the_hindu'
+
+def test_cursor_and_tombstone_entries_are_skipped():
+    payload = load_fixture()
+    comments = parse_reply_timeline(payload, scrape_time=SCRAPE_TIME)
+    assert len(comments) == 6
+    entry_ids = [entry['entryId'] for instruction in payload['data']['threaded_conversation_with_injections_v2']
+                 ['instructions'] for entry in instruction.get('entries', [])]
+    assert 'cursor-bottom-1' in entry_ids
+    assert all(c['status_id'] and c['text'] for c in comments)
+
+def test_other_conversations_are_filtered_out():
+    assert parse_reply_timeline(json.dumps(load_fixture()), '42', SCRAPE_TIME) == []
+
+def test_twitter_time_to_iso():
+    assert twitter_time_to_iso('Mon Jun 03 07:07:54 +0000 2019') == '2019-06-03T07:07:54.000Z'
+    assert twitter_time_to_iso('Mon Jun 03 12:37:54 +0530 2019') == '2019-06-03T07:07:54.000Z'
+    assert twitter_time_to_iso('not a date') is None
+
+def test_reply_timeline_request_ids():
+    def entry(method, url, request_id):
+        message = {'message': {'method': method, 'params': {'requestId': request_id, 'response': {'url': url}}}}
+        return {'message': json.dumps(message)}
+
+    log = [
+        entry('Network.responseReceived', 'https://x.com/i/api/graphql/abc/TweetDetail?variables=1', 'a'),
+        entry('Network.responseReceived', 'https://x.com/i/api/graphql/abc/HomeTimeline', 'b'),
+        entry('Network.requestWillBeSent', 'https://x.com/i/api/graphql/abc/TweetDetail', 'c'),
+        {'message': 'not json'},
+    ]
+    assert list(iter_reply_timeline_request_ids(log)) == ['a']
@@ -0,0 +1,74 @@
+import asyncio
+import filecmp
+import json
+import os
+
+import twitter_scraper_new as scraper
+from job_state import JobStore, RetryScheduler
+from pipeline import ScrapePipeline
+from process_comments_new import process_json_files
+from processed_files import COMBINED_BASENAME
+
+URLS = [f'https://x.com/ndtv/status/{1900000000000000000 + i}' for i in range(4)]
+
+class FakeDriver:
+    current_url = 'https://x.com/home'
+
+    def quit(self):
+        pass
+
+def write_scrape(url, replies):
+    """Write a new_data/ file the way the scraper leaves it: status tweet first, then replies"""
+    channel_name, conversation_id = scraper.extract_url_info(url)
+    post = {'text': f'post {conversation_id}', 'user_name': 'NDTV', 'user_handle': '@ndtv',
+            'post_time': '2025-03-21T17:02:39.000Z'}
+    comments = [dict(post, comment_time=post['post_time'])]
+    comments += [{'text': text, 'user_name': f'user {i}', 'user_handle': f'@user{i}',
+                  'comment_time': '2025-03-22T16:02:37.000Z'} for i, text in enumerate(replies)]
+    with open(scraper.get_output_filename(url), 'w', encoding='utf-8') as f:
+        json.dump({'channel_name': channel_name, 'conversation_id': conversation_id, 'url': url,
+                   'total_comments': len(comments), 'comments': {'post': post, 'comments': comments}}, f)
+    return scraper.count_replies(comments)
+
+def run_pipeline(scrape_url, urls):
+    job_store = JobStore('scrape_jobs.jsonl')
+    job_store.add_urls(urls)
+    pipeline = ScrapePipeline(RetryScheduler(job_store), FakeDriver, lambda driver: None, scrape_url,
+                              num_workers=2, clean_workers=1, queue_size=1, min_interval=0, max_retry_wait=0)
+    written = asyncio.run(pipeline.run())
+    job_store.close()
+    return written
+
+def assert_matches_full_rebuild():
+    process_json_files(workers=1)
+    process_json_files(workers=1, output_folder='rebuilt', incremental=False, manifest_file='rebuilt.json')
+    combined = COMBINED_BASENAME + '.json'
+    assert filecmp.cmp(os.path.join('processed_json', combined), os.path.join('rebuilt', combined), shallow=False)
+    assert sorted(os.listdir('processed_json')) == sorted(os.listdir('rebuilt'))
+
+def test_pipeline_outputs_match_full_rebuild(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('new_data')
+    # Two conversations were processed in an earlier batch run
+    for url in URLS[:2]:
+        write_scrape(url, ['first reply', 'second reply'])
+    process_json_files(workers=1)
+
+    # The pipeline re-scrapes one of them with more replies and scrapes two new ones
+    def scrape_url(driver, url):
+        return write_scrape(url, ['first reply', 'second reply', f'new reply to {url}'])
+
+    written = run_pipeline(scrape_url, URLS[1:])
+    assert written == {url: 3 for url in URLS[1:]}
+    for url in URLS[1:]:
+        assert os.path.exists(os.path.join('processed_json', f'{scraper.extract_url_info(url)[1]}.json'))
+    assert_matches_full_rebuild()
+
+def test_pipeline_requeues_conversations_emptied_by_cleaning(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('new_data')
+    # A reply with no letters or numbers is dropped by cleaning
+    written = run_pipeline(lambda driver, url: write_scrape(url, ['!!!']), URLS[:1])
+    assert written == {URLS[0]: 0}
+    job = JobStore('scrape_jobs.jsonl').get(URLS[0])
+    assert job.status == 'empty' and job.next_attempt_at is not None
@@ -0,0 +1,138 @@
+import threading
+import time
+
+from job_state import FAILED, SUCCEEDED, JobStore, RetryScheduler
+from scraper_pool import ScraperPool
+
+URLS = [f'https://x.com/ndtv/status/{i}' for i in range(12)]
+
+class FakeDriver:
+    def __init__(self, name):
+        self.name = name
+        self.alive = True
+        self.quit_called = False
+
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise ConnectionError('browser is gone')
+        return 'https://x.com/home'
+
+    def quit(self):
+        self.quit_called = True
+
+class FakeScheduler:
+    """Records calls and fails if two threads are ever inside it at once"""
+
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+        self.busy = threading.Lock()
+
+    def call(self, event, url, reply_count=None, error=None):
+        assert self.busy.acquire(blocking=False), 'scheduler entered concurrently'
+        try:
+            self.threads.add(threading.current_thread().name)
+            time.sleep(0.001)
+            self.calls.append((event, url, reply_count, error))
+        finally:
+            self.busy.release()
+        return 'succeeded' if error is None else 'failed'
+
+    def started(self, url):
+        self.call('started', url)
+
+    def record(self, url, reply_count=None, error=None):
+        return self.call('finished', url, reply_count, error)
+
+def make_factory():
+    drivers = []
+
+    def factory():
+        driver = FakeDriver(f'driver-{len(drivers)}')
+        drivers.append(driver)
+        return driver
+    return factory, drivers
+
+def test_urls_are_spread_across_workers():
+    factory, drivers = make_factory()
+    scheduler = FakeScheduler()
+    scraped_by = {}
+
+    def scrape_url(driver, url):
+        time.sleep(0.01)
+        scraped_by[url] = driver.name
+        return 5
+
+    pool = ScraperPool(factory, lambda driver: None, scrape_url, scheduler, num_workers=3, min_interval=0)
+    succeeded, failed, unprocessed = pool.run(URLS)
+    assert succeeded == {url: 5 for url in URLS}
+    assert failed == {} and unprocessed == []
+    assert len(set(scraped_by.values())) == 3
+    assert all(driver.quit_called for driver in drivers)
+
+def test_crashed_worker_does_not_lose_other_results():
+    factory, drivers = make_factory()
+    scheduler = FakeScheduler()
+
+    def scrape_url(driver, url):
+        time.sleep(0.01)
+        if url == URLS[0]:
+            driver.alive = False
+            raise ConnectionError('chrome not reachable')
+        return 3
+
+    pool = ScraperPool(factory, lambda driver: None, scrape_url, scheduler, num_workers=2, min_interval=0,
+                       max_driver_restarts=0)
+    succeeded, failed, unprocessed = pool.run(URLS)
+    assert list(failed) == [URLS[0]]
+    assert succeeded == {url: 3 for url in URLS[1:]}
+    assert unprocessed == []
+    assert sum(driver.quit_called for driver in drivers) == 2
+    finished = [call for call in scheduler.calls if call[0] == 'finished']
+    assert sorted(call[1] for call in finished) == sorted(URLS)
+
+def test_single_writer_records_every_start_before_its_outcome():
+    factory, _ = make_factory()
+    scheduler = FakeScheduler()
+    pool = ScraperPool(factory, lambda driver: None, lambda driver, url: 1, scheduler, num_workers=4,
+                       min_interval=0)
+    pool.run(URLS)
+    # Only the writer thread ever touches the scheduler, one call at a time
+    assert scheduler.threads == {'pool-writer'}
+    assert len(scheduler.calls) == 2 * len(URLS)
+    for url in URLS:
+        events = [call[0] for call in scheduler.calls if call[1] == url]
+        assert events == ['started', 'finished']
+
+def test_failed_url_is_retried_through_the_scheduler(tmp_path):
+    clock = [1000.0]
+    job_store = JobStore(str(tmp_path / 'scrape_jobs.jsonl'), clock=lambda: clock[0])
+    job_store.add_urls(URLS[:3])
+    scheduler = RetryScheduler(job_store, base_delay=60, jitter=0)
+    calls = []
+
+    def scrape_url(driver, url):
+        calls.append(url)
+        if url == URLS[0] and calls.count(url) == 1:
+            raise TimeoutError('replies did not load')
+        return 4
+
+    def run_due():
+        pool = ScraperPool(make_factory()[0], lambda driver: None, scrape_url, scheduler, num_workers=2,
+                           min_interval=0)
+        return pool.run(scheduler.due_urls())
+
+    succeeded, failed, _ = run_due()
+    assert list(failed) == [URLS[0]] and set(succeeded) == set(URLS[1:3])
+    job = job_store.get(URLS[0])
+    assert job.status == FAILED and job.next_attempt_at == 1060.0
+    assert scheduler.due_urls() == []
+
+    clock[0] = 1060.0
+    succeeded, failed, _ = run_due()
+    assert succeeded == {URLS[0]: 4} and failed == {}
+    job = job_store.get(URLS[0])
+    assert job.status == SUCCEEDED and job.attempts == 2
+    assert calls.count(URLS[0]) == 2
+    job_store.close()
@@ -0,0 +1,35 @@
+import pytest
+
+import twitter_scraper_new as scraper
+from adaptive_waits import PAGE_STATE_JS
+from checkpoint_journal import CheckpointJournal
+
+class DeadBrowserDriver:
+    """Renders the first page, then dies when the scraper reads the scroll height"""
+
+    def find_elements(self, by, selector):
+        return ['tweet'] if by == 'css selector' else []
+
+    def find_element(self, by, selector):
+        raise LookupError('no post')
+
+    def execute_script(self, script, *args):
+        if script == PAGE_STATE_JS:
+            return {'replies': 1, 'height': 1000, 'spinners': 0, 'quiet_ms': 1000}
+        if script == scraper.EXTRACT_COMMENTS_JS:
+            return '[]'
+        raise ConnectionError('chrome not reachable')
+
+def test_journal_is_closed_when_the_browser_dies(tmp_path, monkeypatch):
+    journals = []
+
+    class RecordingJournal(CheckpointJournal):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            journals.append(self)
+    monkeypatch.setattr(scraper, 'CheckpointJournal', RecordingJournal)
+
+    with pytest.raises(ConnectionError):
+        scraper.scroll_and_extract_comments(DeadBrowserDriver(), '1', 'https://x.com/ndtv/status/1',
+                                            str(tmp_path / 'ndtv_comments_1.json'))
+    assert len(journals) == 1 and journals[0].file.closed
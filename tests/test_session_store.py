@@ -0,0 +1,157 @@
+import itertools
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from session_store import SessionStore
+
+class FakeSite:
+    """Issues auth tokens on login and tells drivers whether their cookie is still accepted"""
+
+    def __init__(self):
+        self.valid_tokens = set()
+        self.tokens = itertools.count(1)
+        self.logins = 0
+        self.lock = threading.Lock()
+
+    def login(self, driver):
+        with self.lock:
+            self.logins += 1
+            token = f'token-{next(self.tokens)}'
+            self.valid_tokens.add(token)
+        time.sleep(0.05)
+        driver.cookies = {'auth_token': {'name': 'auth_token', 'value': token, 'expiry': None}}
+
+class FakeDriver:
+    def __init__(self, site):
+        self.site = site
+        self.cookies = {}
+        self.local_storage = {}
+        self.current_url = 'about:blank'
+
+    def logged_in(self):
+        cookie = self.cookies.get('auth_token')
+        return cookie is not None and cookie['value'] in self.site.valid_tokens
+
+    def get(self, url):
+        # The site bounces logged-out visitors of /home to the login flow
+        self.current_url = 'https://x.com/i/flow/login' if url.endswith('/home') and not self.logged_in() else url
+
+    def get_cookies(self):
+        return list(self.cookies.values())
+
+    def add_cookie(self, cookie):
+        self.cookies[cookie['name']] = cookie
+
+    def delete_all_cookies(self):
+        self.cookies = {}
+
+    def execute_script(self, script, *args):
+        if args:
+            self.local_storage.update(args[0])
+            return None
+        return dict(self.local_storage)
+
+    def find_elements(self, by, selector):
+        return ['account switcher'] if self.logged_in() else []
+
+class Clock:
+    def __init__(self):
+        self.now = 1000000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def site():
+    return FakeSite()
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+def make_store(tmp_path, clock):
+    return SessionStore(str(tmp_path / 'sessions' / 'session.json'), max_age=3600, probe_timeout=1, clock=clock)
+
+def test_saved_session_is_reused(tmp_path, site, clock):
+    store = make_store(tmp_path, clock)
+    store.ensure_logged_in(FakeDriver(site), site.login)
+    driver = FakeDriver(site)
+    store.ensure_logged_in(driver, site.login)
+    assert site.logins == 1
+    assert driver.logged_in()
+    assert os.stat(store.path).st_mode & 0o777 == 0o600
+
+def test_session_file_is_never_readable_by_others(tmp_path, site, clock, monkeypatch):
+    store = make_store(tmp_path, clock)
+    os.makedirs(os.path.dirname(store.path))
+    # A stale temp file from a crash, with the usual default mode
+    with open(store.path + '.tmp', 'w') as f:
+        f.write('{}')
+    os.chmod(store.path + '.tmp', 0o644)
+    modes = []
+    dump = json.dump
+
+    def checking_dump(obj, f, **kwargs):
+        modes.append(os.stat(store.path + '.tmp').st_mode & 0o777)
+        dump(obj, f, **kwargs)
+    monkeypatch.setattr(json, 'dump', checking_dump)
+    old_umask = os.umask(0o022)
+    try:
+        store.ensure_logged_in(FakeDriver(site), site.login)
+    finally:
+        os.umask(old_umask)
+    assert modes == [0o600]
+    assert os.stat(store.path).st_mode & 0o777 == 0o600
+
+def test_expired_session_triggers_fresh_login(tmp_path, site, clock):
+    store = make_store(tmp_path, clock)
+    store.ensure_logged_in(FakeDriver(site), site.login)
+    clock.now += 3601
+    assert store.load() is None
+    driver = FakeDriver(site)
+    store.ensure_logged_in(driver, site.login)
+    assert site.logins == 2
+    assert driver.logged_in()
+
+def test_expired_cookies_trigger_fresh_login(tmp_path, site, clock):
+    store = make_store(tmp_path, clock)
+
+    def login_with_expiring_cookie(driver):
+        site.login(driver)
+        driver.cookies['auth_token']['expiry'] = clock.now + 60
+    store.ensure_logged_in(FakeDriver(site), login_with_expiring_cookie)
+    clock.now += 61
+    store.ensure_logged_in(FakeDriver(site), site.login)
+    assert site.logins == 2
+
+def test_logged_out_page_invalidates_saved_session(tmp_path, site, clock):
+    store = make_store(tmp_path, clock)
+    store.ensure_logged_in(FakeDriver(site), site.login)
+    # The site revokes the token, e.g. after a logout elsewhere
+    site.valid_tokens.clear()
+
+    def failing_login(driver):
+        raise RuntimeError('login flow unavailable')
+    with pytest.raises(RuntimeError):
+        store.ensure_logged_in(FakeDriver(site), failing_login)
+    assert not os.path.exists(store.path)
+
+    driver = FakeDriver(site)
+    store.ensure_logged_in(driver, site.login)
+    assert driver.logged_in()
+    assert store.load()['cookies'][0]['value'] in site.valid_tokens
+
+def test_concurrent_workers_log_in_once(tmp_path, site, clock):
+    store = make_store(tmp_path, clock)
+    drivers = [FakeDriver(site) for _ in range(4)]
+    threads = [threading.Thread(target=store.ensure_logged_in, args=(driver, site.login)) for driver in drivers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert site.logins == 1
+    assert all(driver.logged_in() for driver in drivers)
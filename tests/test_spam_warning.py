@@ -0,0 +1,45 @@
+from adaptive_waits import PageTimings
+from twitter_scraper_new import handle_spam_warning
+
+class FakeButton:
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+class FakeDriver:
+    def __init__(self, warning):
+        self.warning = warning
+        self.clicked = []
+        self.lookups = 0
+
+    def find_elements(self, by, selector):
+        self.lookups += 1
+        return [FakeButton()] if self.warning else []
+
+    def find_element(self, by, selector):
+        return FakeButton()
+
+    def execute_script(self, script, *args):
+        if args:
+            self.clicked.append(args[0])
+            return None
+        # Page state for wait_for_quiescence: settled at once
+        return {'replies': 0, 'height': 1000, 'spinners': 0, 'quiet_ms': 1000}
+
+def test_no_warning_costs_one_lookup_and_is_timed():
+    driver = FakeDriver(warning=False)
+    timings = PageTimings('https://x.com/ndtv/status/1')
+    assert handle_spam_warning(driver, timings) is False
+    assert driver.lookups == 1 and driver.clicked == []
+    assert timings.counts['spam warning'] == 1
+
+def test_warning_is_clicked_and_the_wait_is_timed():
+    driver = FakeDriver(warning=True)
+    timings = PageTimings('https://x.com/ndtv/status/1')
+    assert handle_spam_warning(driver, timings) is True
+    assert len(driver.clicked) == 1
+    # The settle wait after the click is recorded on the same timings
+    assert timings.counts['spam warning'] == 1
+    assert timings.counts['wait:spam warning'] == 1
@@ -8,9 +8,44 @@ import time
 import json
 import os
 
+from adaptive_waits import PageTimings, get_page_state, timed_wait, wait_for_new_content, wait_for_quiescence
+from browser_profile import apply_lean_options, block_heavy_requests, get_page_traffic, start_traffic_recording
+from checkpoint_journal import CheckpointJournal, get_journal_filename, remove_journal, replay_journal
+from comment_store import CommentStore, status_id_from_permalink
+from job_state import EMPTY, JOBS_FILE, SUCCEEDED, JobStore, RetryScheduler
+from network_capture import capture_network_comments, enable_performance_logging
+from scraper_metrics import METRICS_FILE, ScraperMetrics, browser_rss_kb, driver_call_counter
+from scraper_pool import run_pool, write_processed_urls
+from session_store import SessionStore
+
 # Path to your ChromeDriver executable
 CHROMEDRIVER_PATH = '/home/pathik/Videos/DataScrapping/chromedriver'
 
+# Site root; point at a local mock server (mock_twitter_server.py) for offline runs
+BASE_URL = 'https://x.com'
+
+# Saved cookies/localStorage so login_to_twitter runs once per account
+SESSION_FILE = 'sessions/twitter_session.json'
+
+# 'dom' scrapes rendered replies; 'network' parses the reply-timeline responses
+# from Chrome's performance log (real tweet IDs, engagement counts)
+CAPTURE_MODE = 'dom'
+
+# 'full' re-reads every rendered reply on each pass; 'mark' only reads replies not
+# seen before; 'prune' also hides harvested replies far above the viewport so
+# per-scroll cost and layout work stay flat on long threads
+DOM_MODE = 'full'
+
+# 'full' renders everything in a maximized window; 'lean' runs headless in a small
+# viewport and blocks images, media, fonts and analytics
+BROWSER_PROFILE = 'full'
+
+# Number of parallel browser sessions; 1 keeps the original single-browser loop
+NUM_WORKERS = 1
+
+# Port for a Prometheus /metrics endpoint on localhost; None only writes scraper_metrics.jsonl
+METRICS_PORT = None
+
 def extract_url_info(url):
     """Extract channel name and conversation ID from URL"""
     parts = url.strip().split('/')
@@ -24,13 +59,24 @@ def get_output_filename(url):
     return f'new_data/{channel_name}_comments_{conversation_id}.json'
 
 def load_existing_comments(filename):
-    """Load existing comments from file if it exists"""
+    """Load existing comments from file and its checkpoint journal, if they exist"""
+    comments, last_height = [], 0
     try:
         with open(filename, 'r', encoding='utf-8') as f:
             data = json.load(f)
-            return data.get('comments', []), data.get('metadata', {}).get('last_scroll_position', 0)
+            comments = data.get('comments', [])
+            # Finished files nest the list as {'post': ..., 'comments': [...]}
+            if isinstance(comments, dict):
+                comments = comments.get('comments', [])
+            last_height = data.get('metadata', {}).get('last_scroll_position', 0)
     except FileNotFoundError:
-        return [], 0
+        pass
+    journal_comments, journal_height = replay_journal(get_journal_filename(filename))
+    return comments + journal_comments, max(last_height, journal_height)
+
+def count_replies(comments):
+    """Replies in a scraped comment list; its first record is the status tweet itself"""
+    return max(len(comments) - 1, 0)
 
 def save_comments_checkpoint(filename, comments, conversation_id, url, last_height):
     """Save comments to file as a checkpoint"""
@@ -50,17 +96,25 @@ def save_comments_checkpoint(filename, comments, conversation_id, url, last_heig
             }
         }, f, ensure_ascii=False, indent=2)
 
-def handle_spam_warning(driver):
-    """Handle Twitter's spam warning popup"""
+def finalize_comments_checkpoint(filename, comments, conversation_id, url, last_height):
+    """Compact the conversation into the final JSON layout and drop its checkpoint journal"""
+    save_comments_checkpoint(filename, comments, conversation_id, url, last_height)
+    remove_journal(get_journal_filename(filename))
+
+SPAM_BUTTON_SELECTORS = [
+    "//span[contains(text(), 'Show probable spam')]",
+    "//div[@role='button'][contains(., 'Show probable spam')]",
+    "//div[contains(@class, 'r-button')][contains(., 'Show probable spam')]"
+]
+
+def handle_spam_warning(driver, timings=None):
+    """Handle Twitter's spam warning popup; returns True if it was found and clicked"""
+    start = time.monotonic()
     try:
-        # Look for the spam warning button using multiple possible selectors
-        spam_button_selectors = [
-            "//span[contains(text(), 'Show probable spam')]",
-            "//div[@role='button'][contains(., 'Show probable spam')]",
-            "//div[contains(@class, 'r-button')][contains(., 'Show probable spam')]"
-        ]
-        
-        for selector in spam_button_selectors:
+        # One lookup across every selector, so a page without the warning costs a single driver call
+        if not driver.find_elements(By.XPATH, ' | '.join(SPAM_BUTTON_SELECTORS)):
+            return False
+        for selector in SPAM_BUTTON_SELECTORS:
             try:
                 print(f"Looking for spam warning with selector: {selector}")
                 button = WebDriverWait(driver, 5).until(
@@ -77,7 +131,7 @@ def handle_spam_warning(driver):
                     print("Successfully clicked spam warning button using regular click")
                 
                 # Wait for content to load after clicking
-                time.sleep(10)
+                wait_for_quiescence(driver, 10, 'spam warning', timings)
                 return True
             except Exception as e:
                 print(f"Selector {selector} failed: {str(e)}")
@@ -86,59 +140,71 @@ def handle_spam_warning(driver):
     except Exception as e:
         print(f"Error handling spam warning: {str(e)}")
         return False
+    finally:
+        if timings is not None:
+            timings.add('spam warning', time.monotonic() - start)
 
-def scroll_and_extract_comments(driver, conversation_id, url, output_filename, max_attempts=100):
-    comments = []
-    seen_comments = set()
-    last_height = 0
-    consecutive_same_height = 0
-    base_scroll_pause_time = 5
-    scroll_pause_time = base_scroll_pause_time
-    no_new_comments_count = 0
-    request_count = 0
-
-    print("Waiting for initial page load...")
-    try:
-        from selenium.webdriver.support import expected_conditions as EC
-        from selenium.webdriver.support.ui import WebDriverWait
-        WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="tweetText"]'))
-        )
-        print("Page loaded successfully")
-    except Exception as e:
-        print("Warning: Timeout waiting for initial tweets to load")
-
-    time.sleep(15)
-
-    # --- Extract post data before comments ---
-    post_data = {}
-    try:
-        post_element = driver.find_element(By.CSS_SELECTOR, '[data-testid="tweet"]')
-        post_text = post_element.find_element(By.CSS_SELECTOR, '[data-testid="tweetText"]').text
-        try:
-            user_name = post_element.find_element(By.CSS_SELECTOR, 'div.r-1wbh5a2.r-dnmrzs span').text
-        except Exception:
-            user_name = None
-        try:
-            user_handle = post_element.find_element(By.CSS_SELECTOR, 'div.r-1wbh5a2.r-dnmrzs span+span').text
-        except Exception:
-            user_handle = None
-        try:
-            post_time = post_element.find_element(By.TAG_NAME, 'time').get_attribute('datetime')
-        except Exception:
-            post_time = None
-        post_data = {
-            'text': post_text,
-            'user_name': user_name,
-            'user_handle': user_handle,
-            'post_time': post_time,
-            'scrape_time': time.strftime('%Y-%m-%d %H:%M:%S')
+# Pulls text, user name/handle, time and permalink for every visible reply in a
+# single execute_script round-trip. Mirrors the per-element Selenium lookups below.
+# arguments[0] is {only_new, prune_viewports}. With only_new, replies already
+# returned by an earlier call are skipped; each extracted reply is marked with its
+# permalink (or text) so a recycled node showing a different reply is read again.
+# With prune_viewports set, harvested replies more than that many viewport heights
+# above the screen are hidden with display:none and marked data-scraper-pruned.
+# Their nodes stay in place because React owns them; only inline styles change,
+# and the enclosing cell keeps its height so the scroll position holds. The
+# script holds no references once it returns.
+EXTRACT_COMMENTS_JS = """
+var options = arguments[0] || {};
+var pruneAbove = options.prune_viewports ? window.innerHeight * options.prune_viewports : null;
+var results = [];
+var elements = document.querySelectorAll('[data-testid="tweetText"]');
+for (var i = 0; i < elements.length; i++) {
+    var element = elements[i];
+    var parent = element;
+    for (var level = 0; level < 5 && parent.parentElement; level++) {
+        parent = parent.parentElement;
+    }
+    var timeElement = parent.querySelector('time');
+    var linkElement = timeElement ? timeElement.closest('a') : null;
+    var permalink = linkElement ? linkElement.getAttribute('href') : null;
+    var seenKey = permalink || element.innerText;
+    if (options.only_new && element.getAttribute('data-scraper-seen') === seenKey) {
+        if (pruneAbove !== null) {
+            var article = element.closest('article') || parent;
+            if (!article.hasAttribute('data-scraper-pruned')) {
+                var rect = article.getBoundingClientRect();
+                if (rect.bottom < -pruneAbove) {
+                    if (article.parentElement) {
+                        article.parentElement.style.minHeight = rect.height + 'px';
+                    }
+                    article.style.display = 'none';
+                    article.setAttribute('data-scraper-pruned', '1');
+                }
+            }
         }
-    except Exception as e:
-        print(f"Error extracting post details: {str(e)}")
+        continue;
+    }
+    element.setAttribute('data-scraper-seen', seenKey);
+    var userElement = parent.querySelector('div.r-1wbh5a2.r-dnmrzs span');
+    var handleElement = parent.querySelector('div.r-1wbh5a2.r-dnmrzs span+span');
+    results.push({
+        text: element.innerText,
+        user_name: userElement ? userElement.innerText : null,
+        user_handle: handleElement ? handleElement.innerText : null,
+        comment_time: timeElement ? timeElement.getAttribute('datetime') : null,
+        permalink: permalink
+    });
+}
+return JSON.stringify(results);
+"""
+
+# How far above the viewport (in viewport heights) harvested replies are pruned
+PRUNE_VIEWPORTS = 3
 
-    # --- Extract first page comments before scrolling ---
-    print("Extracting first page comments before scrolling...")
+def extract_comments_per_element(driver):
+    """Extract visible comments with one Selenium lookup per field (slow fallback path)"""
+    comments = []
     comment_elements = driver.find_elements(By.CSS_SELECTOR, '[data-testid="tweetText"]')
     for element in comment_elements:
         try:
@@ -154,245 +220,474 @@ def scroll_and_extract_comments(driver, conversation_id, url, output_filename, m
                 comment_time = time_element.get_attribute('datetime')
             except Exception:
                 comment_time = None
+            try:
+                link_element = parent.find_element(By.XPATH, ".//a[.//time]")
+                status_id = status_id_from_permalink(link_element.get_attribute('href'))
+            except Exception:
+                status_id = None
             try:
                 handle_element = parent.find_element(By.CSS_SELECTOR, 'div.r-1wbh5a2.r-dnmrzs span+span')
                 user_handle = handle_element.text
             except Exception:
                 user_handle = None
-            comment_key = (comment_text, user_name, comment_time)
-            if comment_text and comment_key not in seen_comments:
-                seen_comments.add(comment_key)
-                comments.append({
-                    'text': comment_text,
-                    'user_name': user_name,
-                    'user_handle': user_handle,
-                    'comment_time': comment_time,
-                    'scrape_time': time.strftime('%Y-%m-%d %H:%M:%S')
-                })
+            comments.append({
+                'text': comment_text,
+                'user_name': user_name,
+                'user_handle': user_handle,
+                'comment_time': comment_time,
+                'scrape_time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'status_id': status_id
+            })
         except Exception as e:
             print(f"Error extracting comment details: {str(e)}")
             continue
-    print(f"First page comments extracted: {len(comments)}")
+    return comments
+
+def extract_comments_batched(driver, dom_mode='full'):
+    """Extract visible comments in a single execute_script round-trip.
+
+    dom_mode 'full' reads every rendered reply, 'mark' only replies not read by
+    an earlier call, and 'prune' additionally hides harvested replies far above
+    the viewport so the browser stops laying them out.
+    """
+    options = {
+        'only_new': dom_mode in ('mark', 'prune'),
+        'prune_viewports': PRUNE_VIEWPORTS if dom_mode == 'prune' else None
+    }
+    raw_comments = json.loads(driver.execute_script(EXTRACT_COMMENTS_JS, options))
+    scrape_time = time.strftime('%Y-%m-%d %H:%M:%S')
+    return [{
+        'text': c.get('text'),
+        'user_name': c.get('user_name'),
+        'user_handle': c.get('user_handle'),
+        'comment_time': c.get('comment_time'),
+        'scrape_time': scrape_time,
+        'status_id': status_id_from_permalink(c.get('permalink'))
+    } for c in raw_comments]
+
+def extract_visible_comments(driver, batched=True, dom_mode='full'):
+    """Extract visible comments, falling back to the per-element path if the batched script fails"""
+    if batched:
+        try:
+            return extract_comments_batched(driver, dom_mode)
+        except Exception as e:
+            print(f"Batched extraction failed, falling back to per-element extraction: {str(e)}")
+    return extract_comments_per_element(driver)
+
+def extract_comments(driver, conversation_id, batched=True, capture_mode='dom', dom_mode='full'):
+    """Collect new replies from the network log or the rendered page, depending on capture_mode"""
+    if capture_mode == 'network':
+        try:
+            return capture_network_comments(driver, conversation_id)
+        except Exception as e:
+            print(f"Network capture failed, falling back to DOM extraction: {str(e)}")
+    return extract_visible_comments(driver, batched, dom_mode)
 
-    # --- Scrolling and extracting more comments ---
-    print("Scrolling to load more comments...")
-    last_height = driver.execute_script("return document.documentElement.scrollHeight")
+def scroll_and_extract_comments(driver, conversation_id, url, output_filename, max_attempts=100, batched=True,
+                                stop_on_no_new_comments=True, checkpoint_mode='journal', fsync_every=5, timings=None,
+                                capture_mode='dom', dom_mode='full'):
+    store = CommentStore()
+    journal = None
+    saved_count = 0
+    last_height = 0
     consecutive_same_height = 0
-    for attempt in range(max_attempts):
+    base_scroll_pause_time = 5
+    scroll_pause_time = base_scroll_pause_time
+    no_new_comments_count = 0
+    request_count = 0
+
+    print("Waiting for initial page load...")
+    loaded, _ = timed_wait(lambda: driver.find_elements(By.CSS_SELECTOR, '[data-testid="tweetText"]'),
+                           30, 'initial tweets', timings)
+    if loaded:
+        print("Page loaded successfully")
+    else:
+        print("Warning: Timeout waiting for initial tweets to load")
+
+    wait_for_quiescence(driver, 15, 'initial render', timings)
+    handle_spam_warning(driver, timings)
+
+    # --- Resume from a previous checkpoint of this conversation, if any ---
+    existing_comments, resume_height = load_existing_comments(output_filename)
+    if existing_comments:
+        store.add_many(existing_comments)
+        saved_count = len(store)
+        print(f"Resuming with {len(store)} previously saved comments")
+    if checkpoint_mode == 'journal':
+        journal = CheckpointJournal(get_journal_filename(output_filename), fsync_every=fsync_every)
+
+    def save_checkpoint():
+        """Append only unsaved replies to the journal, or rewrite the full checkpoint file"""
+        nonlocal saved_count
+        start = time.monotonic()
+        height = driver.execute_script("return document.documentElement.scrollHeight")
+        if journal:
+            written = journal.bytes_written
+            journal.append(store.new_since(saved_count), height)
+            written = journal.bytes_written - written
+        else:
+            save_comments_checkpoint(output_filename, store.to_list(), conversation_id, url, height)
+            written = os.path.getsize(output_filename)
+        saved_count = len(store)
+        if timings is not None:
+            timings.add('checkpoint', time.monotonic() - start)
+            timings.count('checkpoint bytes', written)
+
+    # The journal is closed (and fsynced) however the scrape ends, e.g. when the browser dies mid-thread
+    try:
+        # --- Extract post data before comments ---
+        post_data = {}
         try:
-            # Extract all comments before scrolling (allow duplicates)
-            comment_elements = driver.find_elements(By.CSS_SELECTOR, '[data-testid="tweetText"]')
-            for element in comment_elements:
-                try:
-                    comment_text = element.text
-                    parent = element.find_element(By.XPATH, "./../../../../..")
-                    try:
-                        user_element = parent.find_element(By.CSS_SELECTOR, 'div.r-1wbh5a2.r-dnmrzs span')
-                        user_name = user_element.text
-                    except Exception:
-                        user_name = None
-                    try:
-                        time_element = parent.find_element(By.TAG_NAME, 'time')
-                        comment_time = time_element.get_attribute('datetime')
-                    except Exception:
-                        comment_time = None
-                    try:
-                        handle_element = parent.find_element(By.CSS_SELECTOR, 'div.r-1wbh5a2.r-dnmrzs span+span')
-                        user_handle = handle_element.text
-                    except Exception:
-                        user_handle = None
-                    comments.append({
-                        'text': comment_text,
-                        'user_name': user_name,
-                        'user_handle': user_handle,
-                        'comment_time': comment_time,
-                        'scrape_time': time.strftime('%Y-%m-%d %H:%M:%S')
-                    })
-                except Exception as e:
-                    print(f"Error extracting comment details: {str(e)}")
-                    continue
-            print(f"Comments collected before scroll: {len(comments)} (attempt {attempt+1})")
-            save_comments_checkpoint(output_filename, comments, conversation_id, url, driver.execute_script("return document.documentElement.scrollHeight"))
-
-            # Scroll to bottom
-            driver.execute_script("window.scrollTo(0, document.documentElement.scrollHeight);")
-            time.sleep(scroll_pause_time + 3)
-            current_height = driver.execute_script("return document.documentElement.scrollHeight")
-            if current_height == last_height:
-                consecutive_same_height += 1
-                print(f"No new scroll height detected (attempt {consecutive_same_height}/3)")
-            else:
-                consecutive_same_height = 0
-            last_height = current_height
-
-            # Click 'Show more replies' buttons if present
+            post_element = driver.find_element(By.CSS_SELECTOR, '[data-testid="tweet"]')
+            post_text = post_element.find_element(By.CSS_SELECTOR, '[data-testid="tweetText"]').text
             try:
-                show_more_buttons = driver.find_elements(By.XPATH, "//span[contains(text(), 'Show more replies')]")
-                for button in show_more_buttons:
-                    driver.execute_script("arguments[0].click();", button)
-                    print("Clicked 'Show more replies' button.")
-                    time.sleep(5)
+                user_name = post_element.find_element(By.CSS_SELECTOR, 'div.r-1wbh5a2.r-dnmrzs span').text
             except Exception:
-                pass
-
-            # Click 'Show probable spam' buttons if present
+                user_name = None
             try:
-                spam_buttons = driver.find_elements(By.XPATH, "//span[contains(text(), 'Show probable spam')]")
-                for button in spam_buttons:
-                    driver.execute_script("arguments[0].click();", button)
-                    print("Clicked 'Show probable spam' button.")
-                    time.sleep(5)
+                user_handle = post_element.find_element(By.CSS_SELECTOR, 'div.r-1wbh5a2.r-dnmrzs span+span').text
+            except Exception:
+                user_handle = None
+            try:
+                post_time = post_element.find_element(By.TAG_NAME, 'time').get_attribute('datetime')
             except Exception:
-                pass
+                post_time = None
+            post_data = {
+                'text': post_text,
+                'user_name': user_name,
+                'user_handle': user_handle,
+                'post_time': post_time,
+                'scrape_time': time.strftime('%Y-%m-%d %H:%M:%S')
+            }
+        except Exception as e:
+            print(f"Error extracting post details: {str(e)}")
+
+        # --- Extract first page comments before scrolling ---
+        print("Extracting first page comments before scrolling...")
+        store.add_many(extract_comments(driver, conversation_id, batched, capture_mode, dom_mode))
+        print(f"First page comments extracted: {len(store)}")
 
-            # Extract all comments after scrolling (allow duplicates)
-            comment_elements = driver.find_elements(By.CSS_SELECTOR, '[data-testid="tweetText"]')
-            for element in comment_elements:
+        # --- Scrolling and extracting more comments ---
+        print("Scrolling to load more comments...")
+        if resume_height:
+            driver.execute_script("window.scrollTo(0, arguments[0]);", resume_height)
+        last_height = driver.execute_script("return document.documentElement.scrollHeight")
+        consecutive_same_height = 0
+        for attempt in range(max_attempts):
+            attempt_start = time.monotonic()
+            try:
+                # Extract visible comments before scrolling, keeping only unseen replies
+                start = time.monotonic()
+                batch = extract_comments(driver, conversation_id, batched, capture_mode, dom_mode)
+                new_before = store.add_many(batch)
+                if timings is not None:
+                    timings.add('extract', time.monotonic() - start)
+                    timings.count('replies new', new_before)
+                    timings.count('replies duplicate', len(batch) - new_before)
+                print(f"Comments collected before scroll: {len(store)} (+{new_before} new, attempt {attempt+1})")
+                save_checkpoint()
+
+                # Scroll to bottom and wait for the next batch of replies to render
+                before = get_page_state(driver)
+                driver.execute_script("window.scrollTo(0, document.documentElement.scrollHeight);")
+                wait_for_new_content(driver, before, scroll_pause_time + 3, 'scroll', timings)
+                current_height = driver.execute_script("return document.documentElement.scrollHeight")
+                if current_height == last_height:
+                    consecutive_same_height += 1
+                    print(f"No new scroll height detected (attempt {consecutive_same_height}/3)")
+                else:
+                    consecutive_same_height = 0
+                last_height = current_height
+
+                # Click 'Show more replies' buttons if present
                 try:
-                    comment_text = element.text
-                    parent = element.find_element(By.XPATH, "./../../../../..")
-                    try:
-                        user_element = parent.find_element(By.CSS_SELECTOR, 'div.r-1wbh5a2.r-dnmrzs span')
-                        user_name = user_element.text
-                    except Exception:
-                        user_name = None
-                    try:
-                        time_element = parent.find_element(By.TAG_NAME, 'time')
-                        comment_time = time_element.get_attribute('datetime')
-                    except Exception:
-                        comment_time = None
-                    try:
-                        handle_element = parent.find_element(By.CSS_SELECTOR, 'div.r-1wbh5a2.r-dnmrzs span+span')
-                        user_handle = handle_element.text
-                    except Exception:
-                        user_handle = None
-                    comments.append({
-                        'text': comment_text,
-                        'user_name': user_name,
-                        'user_handle': user_handle,
-                        'comment_time': comment_time,
-                        'scrape_time': time.strftime('%Y-%m-%d %H:%M:%S')
-                    })
-                except Exception as e:
-                    print(f"Error extracting comment details: {str(e)}")
-                    continue
-            print(f"Comments collected after scroll: {len(comments)} (attempt {attempt+1})")
-            save_comments_checkpoint(output_filename, comments, conversation_id, url, driver.execute_script("return document.documentElement.scrollHeight"))
-
-            # Stop if no new comments after three consecutive scrolls with same height
-            if consecutive_same_height >= 3:
-                print("No new comments or scroll height after 3 attempts. Stopping.")
-                break
-        except Exception as e:
-            print(f"Error during scrolling: {str(e)}")
-            continue
+                    show_more_buttons = driver.find_elements(By.XPATH, "//span[contains(text(), 'Show more replies')]")
+                    for button in show_more_buttons:
+                        before = get_page_state(driver)
+                        driver.execute_script("arguments[0].click();", button)
+                        print("Clicked 'Show more replies' button.")
+                        wait_for_new_content(driver, before, 5, 'show more replies', timings)
+                except Exception:
+                    pass
+
+                # Click 'Show probable spam' buttons if present
+                try:
+                    spam_buttons = driver.find_elements(By.XPATH, "//span[contains(text(), 'Show probable spam')]")
+                    for button in spam_buttons:
+                        before = get_page_state(driver)
+                        driver.execute_script("arguments[0].click();", button)
+                        print("Clicked 'Show probable spam' button.")
+                        wait_for_new_content(driver, before, 5, 'show probable spam', timings)
+                except Exception:
+                    pass
 
-    print(f"Total comments extracted: {len(comments)}")
-    return {'post': post_data, 'comments': comments}
+                # Extract visible comments after scrolling, keeping only unseen replies
+                start = time.monotonic()
+                batch = extract_comments(driver, conversation_id, batched, capture_mode, dom_mode)
+                new_after = store.add_many(batch)
+                if timings is not None:
+                    timings.add('extract', time.monotonic() - start)
+                    timings.count('replies new', new_after)
+                    timings.count('replies duplicate', len(batch) - new_after)
+                print(f"Comments collected after scroll: {len(store)} (+{new_after} new, attempt {attempt+1})")
+                save_checkpoint()
+                if timings is not None:
+                    timings.event('scroll', attempt=attempt + 1, seconds=round(time.monotonic() - attempt_start, 3),
+                                  new=new_before + new_after, replies=len(store), height=current_height)
 
-def login_to_twitter(driver, username, password):
+                if new_before or new_after:
+                    no_new_comments_count = 0
+                else:
+                    no_new_comments_count += 1
+                    print(f"No new unique replies this scroll (attempt {no_new_comments_count}/3)")
+
+                # Stop if no new comments after three consecutive scrolls with same height
+                if consecutive_same_height >= 3:
+                    print("No new comments or scroll height after 3 attempts. Stopping.")
+                    break
+                if stop_on_no_new_comments and no_new_comments_count >= 3:
+                    print("No new unique replies after 3 scrolls. Stopping.")
+                    break
+            except Exception as e:
+                print(f"Error during scrolling: {str(e)}")
+                continue
+    finally:
+        if journal:
+            journal.close()
+    print(f"Total comments extracted: {len(store)}")
+    return {'post': post_data, 'comments': store.to_list()}
+
+def login_to_twitter(driver, username, password, timings=None, base_url=BASE_URL):
     """Handle Twitter login"""
-    driver.get("https://twitter.com/i/flow/login")
-    time.sleep(10)
+    driver.get(f"{base_url}/i/flow/login")
 
     # Enter username
-    username_input = WebDriverWait(driver, 10).until(
-        EC.presence_of_element_located((By.CSS_SELECTOR, 'input[autocomplete="username"]'))
-    )
+    username_input, _ = timed_wait(lambda: driver.find_element(By.CSS_SELECTOR, 'input[autocomplete="username"]'),
+                                   20, 'login username field', timings)
+    if not username_input:
+        raise TimeoutError("Login page did not show the username field")
     username_input.send_keys(username)
     username_input.send_keys(Keys.RETURN)
-    time.sleep(10)
 
     # Enter password
-    password_input = WebDriverWait(driver, 10).until(
-        EC.presence_of_element_located((By.CSS_SELECTOR, 'input[name="password"]'))
-    )
+    password_input, _ = timed_wait(lambda: driver.find_element(By.CSS_SELECTOR, 'input[name="password"]'),
+                                   20, 'login password field', timings)
+    if not password_input:
+        raise TimeoutError("Login flow did not show the password field")
     password_input.send_keys(password)
     password_input.send_keys(Keys.RETURN)
-    time.sleep(10)  # Wait for login to complete
 
-def main():
-    # Initialize Chrome WebDriver
+    # Wait for login to complete: the login flow URL is left once the session is set
+    timed_wait(lambda: '/flow/login' not in driver.current_url, 10, 'login complete', timings)
+
+def create_driver(capture_mode=None, profile=None):
+    """Start a Chrome WebDriver with the scraper's standard or lean options"""
+    profile = profile or BROWSER_PROFILE
     options = webdriver.ChromeOptions()
-    options.add_argument('--start-maximized')
+    if profile == 'lean':
+        apply_lean_options(options)
+    else:
+        options.add_argument('--start-maximized')
     options.add_experimental_option('excludeSwitches', ['enable-automation'])
     options.add_experimental_option('useAutomationExtension', False)
     options.add_argument('--disable-blink-features=AutomationControlled')
+    if (capture_mode or CAPTURE_MODE) == 'network':
+        enable_performance_logging(options)
 
     service = Service(CHROMEDRIVER_PATH)
     driver = webdriver.Chrome(service=service, options=options)
+    if profile == 'lean':
+        block_heavy_requests(driver)
+    return driver
+
+def load_processed_urls(processed_urls_file):
+    """Load previously processed URLs if the tracking file exists"""
+    if os.path.exists(processed_urls_file):
+        with open(processed_urls_file, 'r') as f:
+            return set(json.load(f))
+    return set()
+
+def import_processed_urls(job_store, processed_urls):
+    """Seed job state from processed_urls.json, counting replies in each URL's saved output"""
+    for url in processed_urls:
+        if job_store.get(url) is None:
+            output_filename = get_output_filename(url)
+            reply_count = None
+            if os.path.exists(output_filename):
+                comments, _ = load_existing_comments(output_filename)
+                reply_count = count_replies(comments)
+            job_store.import_finished(url, reply_count)
 
+def load_urls(csv_file, processed_urls, base_url=BASE_URL):
+    """Read and normalize status URLs from the CSV onto base_url, skipping ones already processed"""
+    urls = []
+    with open(csv_file, 'r') as f:
+        for line in f:
+            url = line.strip()
+            if url and ('x.com/' in url or 'twitter.com/' in url) and '/status/' in url:
+                # Normalize URL
+                if not url.startswith('https://'):
+                    url = 'https://' + url.replace('http://', '')
+                url = url.replace('twitter.com/', 'x.com/')
+                if base_url != 'https://x.com':
+                    url = url.replace('https://x.com', base_url, 1)
+                if url not in processed_urls:
+                    urls.append(url)
+    return urls
+
+def scrape_url(driver, url, capture_mode=None, metrics=None):
+    """Scrape one status URL into its new_data/ file and return the number of replies found
+
+    With `metrics` (a ScraperMetrics), the URL's phases, scroll attempts, driver
+    calls and browser memory are recorded whether the scrape succeeds or fails.
+    """
+    timings = PageTimings(url)
+    if metrics is None:
+        return scrape_url_timed(driver, url, timings, capture_mode)
+
+    counter = driver_call_counter(driver)
+    calls = counter['calls']
     try:
-        # Load URLs from CSV file and track progress
-        processed_urls_file = 'processed_urls.json'
-        processed_urls = set()
-        
-        # Load previously processed URLs if file exists
-        if os.path.exists(processed_urls_file):
-            with open(processed_urls_file, 'r') as f:
-                processed_urls = set(json.load(f))
-        
-        # Read URLs from CSV
-        urls = []
-        with open('DataPaper.csv', 'r') as f:
-            for line in f:
-                url = line.strip()
-                if url and ('x.com/' in url or 'twitter.com/' in url) and '/status/' in url:
-                    # Normalize URL
-                    if not url.startswith('https://'):
-                        url = 'https://' + url.replace('http://', '')
-                    url = url.replace('twitter.com/', 'x.com/')
-                    if url not in processed_urls:
-                        urls.append(url)
-        
-        print(f"Found {len(urls)} new URLs to process")
-        
-        # Login to Twitter first
-        print("Please enter your Twitter credentials:")
-        username = "************"
-        password = "***********"
-        
-        login_to_twitter(driver, username, password)
-        print("Login successful!")
-        
-        # Process each URL
-        for url in urls:
-            try:
-                print(f"\nProcessing URL: {url}")
-                channel_name, conversation_id = extract_url_info(url)
-                output_filename = get_output_filename(url)
-                
-                # Navigate to the URL
-                print(f"Navigating to {url}")
-                driver.get(url)
-                time.sleep(10)  # Increased wait for page load
-                
-                # Extract comments for this URL
-                print(f"Starting to extract comments from {channel_name}'s post {conversation_id}")
-                comments = scroll_and_extract_comments(driver, conversation_id, url, output_filename)
-                
-                # Save final version
-                save_comments_checkpoint(output_filename, comments, conversation_id, url, 
-                                      driver.execute_script("return document.documentElement.scrollHeight"))
-                
-                # Mark URL as processed
-                processed_urls.add(url)
-                with open(processed_urls_file, 'w') as f:
-                    json.dump(list(processed_urls), f)
-                
-                print(f"Successfully processed {url}, found {len(comments)} comments")
-                print("Waiting 30 seconds before next URL...")
-                time.sleep(10)
-                
-            except Exception as e:
-                print(f"Error processing URL {url}: {str(e)}")
-                continue
+        reply_count = scrape_url_timed(driver, url, timings, capture_mode)
+    except Exception as e:
+        metrics.record_url(timings, 'failed', str(e), counter['calls'] - calls, browser_rss_kb(driver))
+        raise
+    metrics.record_url(timings, SUCCEEDED if reply_count else EMPTY, None, counter['calls'] - calls,
+                       browser_rss_kb(driver))
+    return reply_count
+
+def scrape_url_timed(driver, url, timings, capture_mode=None):
+    """scrape_url with its phases recorded on `timings`"""
+    print(f"\nProcessing URL: {url}")
+    channel_name, conversation_id = extract_url_info(url)
+    output_filename = get_output_filename(url)
+
+    # Navigate to the URL
+    print(f"Navigating to {url}")
+    with timings.phase('page load'):
+        driver.get(url)
+    start_traffic_recording(driver)
 
+    # Extract comments for this URL
+    print(f"Starting to extract comments from {channel_name}'s post {conversation_id}")
+    comments = scroll_and_extract_comments(driver, conversation_id, url, output_filename, timings=timings,
+                                           capture_mode=capture_mode or CAPTURE_MODE, dom_mode=DOM_MODE)
+
+    try:
+        timings.stats.update(get_page_traffic(driver))
     except Exception as e:
-        print(f"An error occurred: {str(e)}")
+        print(f"Could not read page traffic: {str(e)}")
+
+    # Save final version and compact away the checkpoint journal
+    with timings.phase('final save'):
+        finalize_comments_checkpoint(output_filename, comments, conversation_id, url,
+                                     driver.execute_script("return document.documentElement.scrollHeight"))
+    timings.report()
+    return count_replies(comments['comments'])
+
+def load_jobs(processed_urls_file, base_url=BASE_URL):
+    """Open the job store, seeded from processed_urls.json and new URLs in DataPaper.csv"""
+    job_store = JobStore(JOBS_FILE)
+    import_processed_urls(job_store, load_processed_urls(processed_urls_file))
+    new_count = job_store.add_urls(load_urls('DataPaper.csv', set(), base_url))
+    print(f"Found {new_count} new URLs to process; job states: {job_store.counts()}")
+    return job_store
+
+def open_metrics():
+    """ScraperMetrics for this run, serving /metrics too if METRICS_PORT is set"""
+    metrics = ScraperMetrics(METRICS_FILE)
+    if METRICS_PORT:
+        metrics.serve(METRICS_PORT)
+    return metrics
+
+def session_login(metrics, base_url=BASE_URL):
+    """Login callable for a new driver: restores the saved session or logs in, recording the time in `metrics`"""
+    # Login to Twitter first
+    print("Please enter your Twitter credentials:")
+    username = "************"
+    password = "***********"
+
+    session_store = SessionStore(SESSION_FILE, base_url=base_url + '/', probe_url=base_url + '/home')
+
+    def login(driver):
+        start = time.monotonic()
+        try:
+            session_store.ensure_logged_in(driver, lambda d: login_to_twitter(d, username, password, base_url=base_url))
+        except Exception as e:
+            metrics.record_login(time.monotonic() - start, str(e))
+            raise
+        metrics.record_login(time.monotonic() - start)
+    return login
+
+def main(num_workers=NUM_WORKERS, base_url=BASE_URL, url_delay=10, max_retry_wait=900):
+    processed_urls_file = 'processed_urls.json'
+    job_store = load_jobs(processed_urls_file, base_url)
+    scheduler = RetryScheduler(job_store)
+    metrics = open_metrics()
+    scrape = lambda driver, url: scrape_url(driver, url, metrics=metrics)
+    login = session_login(metrics, base_url)
+
+    def wait_for_retries():
+        """Sleep until the next retry is due; False if none is scheduled within max_retry_wait"""
+        wait = scheduler.next_wait()
+        if wait is None or wait > max_retry_wait:
+            if wait is not None:
+                print(f"Next retry is due in {wait / 60:.0f} minutes; leaving it for a later run")
+            return False
+        print(f"Waiting {wait:.0f} seconds for the next retry...")
+        time.sleep(wait)
+        return True
+
+    try:
+        if num_workers > 1:
+            while True:
+                urls = scheduler.due_urls()
+                if not urls:
+                    if wait_for_retries():
+                        continue
+                    break
+                _, _, unprocessed = run_pool(urls, num_workers, create_driver, login, scrape, scheduler,
+                                             min_interval=url_delay)
+                # URLs no browser got to were never started, so they stay due for the next run
+                if unprocessed:
+                    break
+            return
+
+        driver = create_driver()
+        try:
+            login(driver)
+
+            # Process new URLs first, then retries of empty or failed ones as they come due
+            while True:
+                url = scheduler.next_url()
+                if url is None:
+                    if wait_for_retries():
+                        continue
+                    break
+                scheduler.started(url)
+                try:
+                    reply_count = scrape(driver, url)
+                    status = scheduler.record(url, reply_count)
+                    print(f"Successfully processed {url}, found {reply_count} replies ({status})")
+                except Exception as e:
+                    print(f"Error processing URL {url}: {str(e)}")
+                    scheduler.record(url, error=str(e))
+
+                print(f"Waiting {url_delay} seconds before next URL...")
+                time.sleep(url_delay)
+
+        except Exception as e:
+            print(f"An error occurred: {str(e)}")
+
+        finally:
+            driver.quit()
 
     finally:
-        driver.quit()
+        # processed_urls.json is kept for other tools, written once per run
+        write_processed_urls(processed_urls_file, job_store.urls_with_status(SUCCEEDED, EMPTY))
+        print(f"Job states: {job_store.counts()}")
+        job_store.close()
+        metrics.close()
 
 if __name__ == "__main__":
     main()